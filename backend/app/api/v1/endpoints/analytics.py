@@ -8,7 +8,7 @@ from datetime import datetime
 import structlog
 
 from app.services.analytics import TreasuryAnalyticsEngine, OptimizationResult, CashFlowForecast, LiquidityAnalysis
-from app.services.market_data import MarketDataIngestionPipeline
+from app.services.market_data import market_data_service
 from app.models import CashPosition
 from app.core.database import get_db
 from sqlalchemy.orm import Session
@@ -18,7 +18,6 @@ logger = structlog.get_logger(__name__)
 router = APIRouter()
 
 # Global services
-market_data_service = MarketDataIngestionPipeline()
 analytics_engine = TreasuryAnalyticsEngine(market_data_service)
 
 
@@ -2,30 +2,27 @@
 Market Data API endpoints - Real-time data ingestion and quality monitoring
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Response
 from typing import Dict, Any, List
 from datetime import datetime
 import structlog
 
-from app.services.market_data import MarketDataIngestionPipeline, DataIngestionResult
+from app.services.market_data import DataIngestionResult, market_data_service
 from app.services.data_quality import DataQualityReport
 
 logger = structlog.get_logger(__name__)
 
 router = APIRouter()
 
-# Global market data service instance
-market_data_service = MarketDataIngestionPipeline()
-
-
 @router.get("/summary", response_model=Dict[str, Any])
 async def get_market_summary():
     """
     Get comprehensive market data summary with quality indicators
     """
     try:
-        summary = await market_data_service.get_market_summary()
-        return summary
+        # Serve pre-serialized bytes to skip re-encoding on cache hits
+        content = await market_data_service.get_market_summary_bytes()
+        return Response(content=content, media_type="application/json")
     except Exception as e:
         logger.error("Failed to get market summary", error=str(e))
         raise HTTPException(status_code=500, detail=f"Failed to fetch market data: {str(e)}")
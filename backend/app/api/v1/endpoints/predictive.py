@@ -12,10 +12,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ....core.database import get_db
 from ....services.predictive_analytics import PredictiveAnalyticsService
-from ....services.market_data import MarketDataService
+from ....services.market_data import market_data_service
 
 router = APIRouter()
 
+# Global services; history memo and loaded models persist across requests
+predictive_service = PredictiveAnalyticsService(market_data_service)
+
 
 # Request/Response Models
 class CashFlowForecastRequest(BaseModel):
@@ -102,10 +105,6 @@ async def forecast_cash_flows(
     Generate cash flow forecasts using time series analysis and machine learning
     """
     try:
-        # Initialize services
-        market_data_service = MarketDataService()
-        predictive_service = PredictiveAnalyticsService(market_data_service)
-        
         # Generate forecast
         forecast = await predictive_service.forecast_cash_flows(
             entity_id=request.entity_id,
@@ -116,7 +115,7 @@ async def forecast_cash_flows(
         return CashFlowForecastResponse(
             entity_id=forecast.entity_id,
             forecast_horizon_days=forecast.forecast_horizon_days,
-            daily_forecasts=forecast.daily_forecasts,
+            daily_forecasts=forecast.daily_forecasts.to_records(),
             confidence_intervals=forecast.confidence_intervals,
             key_assumptions=forecast.key_assumptions,
             forecast_accuracy=forecast.forecast_accuracy,
@@ -140,10 +139,6 @@ async def predict_market_volatility(
     Predict market volatility changes using machine learning models
     """
     try:
-        # Initialize services
-        market_data_service = MarketDataService()
-        predictive_service = PredictiveAnalyticsService(market_data_service)
-        
         # Generate volatility forecast
         forecast = await predictive_service.predict_market_volatility(
             asset_class=request.asset_class,
@@ -177,10 +172,6 @@ async def calculate_default_probability(
     Calculate supplier default probability using credit risk models
     """
     try:
-        # Initialize services
-        market_data_service = MarketDataService()
-        predictive_service = PredictiveAnalyticsService(market_data_service)
-        
         # Calculate default probability
         result = await predictive_service.calculate_default_probability(
             supplier_id=request.supplier_id,
@@ -214,10 +205,6 @@ async def generate_scenario_analysis(
     Generate scenario analysis for different market conditions
     """
     try:
-        # Initialize services
-        market_data_service = MarketDataService()
-        predictive_service = PredictiveAnalyticsService(market_data_service)
-        
         # Generate scenario analysis
         result = await predictive_service.generate_scenario_analysis(
             entity_id=request.entity_id,
@@ -227,7 +214,10 @@ async def generate_scenario_analysis(
         return ScenarioAnalysisResponse(
             entity_id=result["entity_id"],
             scenarios=result["scenarios"],
-            base_case=result["base_case"].__dict__,
+            base_case={
+                **result["base_case"].__dict__,
+                "daily_forecasts": result["base_case"].daily_forecasts.to_records()
+            },
             generated_at=result["generated_at"]
         )
         
@@ -247,10 +237,6 @@ async def retrain_predictive_models(
     Retrain predictive models when accuracy falls below threshold
     """
     try:
-        # Initialize services
-        market_data_service = MarketDataService()
-        predictive_service = PredictiveAnalyticsService(market_data_service)
-        
         # Retrain models
         results = await predictive_service.retrain_models(
             force_retrain=request.force_retrain
@@ -277,10 +263,6 @@ async def get_model_performance(
     Get current model performance metrics
     """
     try:
-        # Initialize services
-        market_data_service = MarketDataService()
-        predictive_service = PredictiveAnalyticsService(market_data_service)
-        
         return {
             "model_performance": predictive_service.model_performance,
             "timestamp": datetime.now().isoformat()
@@ -335,10 +317,6 @@ async def predictive_health_check():
     Health check for predictive analytics services
     """
     try:
-        # Initialize services to check availability
-        market_data_service = MarketDataService()
-        predictive_service = PredictiveAnalyticsService(market_data_service)
-        
         return {
             "status": "healthy",
             "models_loaded": {
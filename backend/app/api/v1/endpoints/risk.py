@@ -12,11 +12,14 @@ import structlog
 from app.core.database import get_db
 from app.models import CorporateEntity, CashPosition, Investment, FXExposure, RiskMetrics, RiskAlert
 from app.services.risk import RiskCalculationService
-from app.services.market_data import MarketDataService
+from app.services.market_data import market_data_service
 
 logger = structlog.get_logger(__name__)
 router = APIRouter()
 
+# Global services; the VaR and correlation caches persist across requests
+risk_service = RiskCalculationService(market_data_service)
+
 
 @router.post("/calculate-var/{entity_id}")
 async def calculate_portfolio_var(
@@ -54,10 +57,6 @@ async def calculate_portfolio_var(
         )
         fx_exposures = fx_result.scalars().all()
         
-        # Initialize services
-        market_data_service = MarketDataService()
-        risk_service = RiskCalculationService(market_data_service)
-        
         # Calculate VaR
         var_result = await risk_service.calculate_portfolio_var(
             cash_positions=list(cash_positions),
@@ -131,10 +130,6 @@ async def assess_currency_risk(
         )
         fx_exposures = fx_result.scalars().all()
         
-        # Initialize services
-        market_data_service = MarketDataService()
-        risk_service = RiskCalculationService(market_data_service)
-        
         # Assess currency risk
         currency_risk = await risk_service.assess_currency_risk(list(fx_exposures))
         
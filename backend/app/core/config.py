@@ -79,6 +79,9 @@ class Settings(BaseSettings):
     DEFAULT_VAR_HORIZON: int = 1  # days
     RISK_CALCULATION_TIMEOUT: int = 30  # seconds
     
+    # Predictive Models
+    USE_LIGHTGBM: bool = False  # Requires the optional lightgbm package
+    
     # Performance
     MAX_CONCURRENT_REQUESTS: int = 100
     REQUEST_TIMEOUT: int = 30
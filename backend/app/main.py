@@ -16,6 +16,8 @@ from app.core.logging import setup_logging
 from app.api.v1.api import api_router
 from app.core.database import engine, Base
 from app.core.redis import redis_client
+from app.services.market_data import market_data_service
+from app.services.predictive_analytics import shutdown_training_pool
 
 # Setup structured logging
 setup_logging()
@@ -44,6 +46,8 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down TreasuryIQ application")
     await redis_client.close()
+    await market_data_service.aclose()
+    shutdown_training_pool()
 
 
 # Create FastAPI application
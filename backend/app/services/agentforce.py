@@ -19,7 +19,7 @@ from ..models.ai import ConversationContext, ConversationTurn, AIInsight, Insigh
 from ..models.corporate import CorporateEntity
 from ..services.analytics import TreasuryAnalyticsEngine
 from ..services.risk import RiskCalculationService
-from ..services.market_data import MarketDataService
+from ..services.market_data import market_data_service
 
 logger = logging.getLogger(__name__)
 
@@ -121,7 +121,6 @@ class AgentforceService:
         self.db = db
         self.conversation_manager = ConversationManager(db)
         # Initialize services
-        market_data_service = MarketDataService()
         self.analytics_engine = TreasuryAnalyticsEngine(market_data_service)
         self.risk_service = RiskCalculationService(market_data_service)
         
@@ -503,9 +502,9 @@ The current volatility level is manageable but monitoring is recommended due to
                 "response": """Value at Risk (VaR) is a statistical measure that quantifies the potential loss in portfolio value over a specific time period at a given confidence level.
 
 **How VaR is calculated:**
+• Parametric approach based on portfolio volatility and correlations (default)
+• Monte Carlo simulation with 10,000 scenarios, on request
 • Historical simulation method using 250 days of market data
-• Monte Carlo simulation with 10,000 scenarios
-• Parametric approach based on portfolio volatility and correlations
 
 **Current VaR Analysis:**
 • 1-day VaR (95% confidence): $2.45M
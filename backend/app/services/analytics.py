@@ -2,11 +2,18 @@
 Treasury Analytics Engine - Core optimization and analysis algorithms
 """
 
+import asyncio
+import heapq
+import time
+import weakref
 import numpy as np
+from scipy.optimize import linprog
 from typing import List, Dict, Optional, Tuple, Any
 from decimal import Decimal
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from collections import OrderedDict
+from operator import itemgetter
 import structlog
 
 from app.models import CashPosition, Investment, FXExposure
@@ -14,6 +21,41 @@ from app.services.market_data import MarketDataService
 
 logger = structlog.get_logger(__name__)
 
+_CENT = Decimal("0.01")
+
+
+def _to_cents(amount: float) -> Decimal:
+    """Float amount as a cent-quantized Decimal for result fields"""
+    return Decimal(repr(float(amount))).quantize(_CENT)
+
+
+# Benchmark market rate for each account type
+_RATE_MAPPING = {
+    "checking": "fed_funds",
+    "savings": "treasury_3m",
+    "money_market": "treasury_6m",
+    "cd": "treasury_1y",
+    "treasury": "treasury_2y"
+}
+
+# Default benchmark rates (%) if market data unavailable
+_DEFAULT_RATES_F = {
+    "checking": 0.01,
+    "savings": 2.50,
+    "money_market": 3.00,
+    "cd": 4.00,
+    "treasury": 4.50
+}
+
+# Market-based yield adjustment (%) by account type
+_MARKET_ADJ = {
+    "checking": 0.0,
+    "savings": 0.5,
+    "money_market": 1.0,
+    "cd": 1.5,
+    "treasury": 2.0,
+}
+
 
 @dataclass
 class OptimizationResult:
@@ -45,14 +87,45 @@ class LiquidityAnalysis:
     liquidity_gap: Decimal
     recommended_buffer: Decimal
     risk_level: str  # "low", "medium", "high", "critical"
+    total_cash: Decimal = Decimal("0")
+    immediate_liquidity: Decimal = Decimal("0")
 
 
 class TreasuryAnalyticsEngine:
     """Advanced analytics engine for treasury optimization"""
     
+    RATES_CACHE_TTL_SECONDS = 60
+    OPTIMIZATION_CACHE_SIZE = 128
+    
     def __init__(self, market_data_service: MarketDataService):
         self.market_data = market_data_service
-        self._optimization_cache: Dict[str, Any] = {}
+        
+        # Optimization outputs keyed by everything the optimizer reads from the positions
+        # and the constraints; the optimization is deterministic so entries never go stale
+        self._optimization_cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        
+        # Federal Reserve rates as (expiry on the monotonic clock, rates); the lock makes
+        # concurrent analyses share a single upstream fetch
+        self._rates_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._rates_lock = asyncio.Lock()
+        
+        # Per-position (balance, interest_rate, float balance, float rate); an entry is
+        # reused while the position still holds the same balance and rate objects
+        self._position_floats: "weakref.WeakKeyDictionary[CashPosition, Tuple[Any, Any, float, float]]" = (
+            weakref.WeakKeyDictionary()
+        )
+    
+    async def _rates(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """Federal Reserve rates, memoized for RATES_CACHE_TTL_SECONDS"""
+        async with self._rates_lock:
+            if not force_refresh and self._rates_cache is not None:
+                expiry, rates = self._rates_cache
+                if time.monotonic() < expiry:
+                    return rates
+            
+            rates = await self.market_data.get_federal_reserve_rates()
+            self._rates_cache = (time.monotonic() + self.RATES_CACHE_TTL_SECONDS, rates)
+            return rates
     
     async def calculate_optimal_cash_allocation(
         self, 
@@ -65,14 +138,17 @@ class TreasuryAnalyticsEngine:
         """
         try:
             # Get current market rates
-            market_rates = await self.market_data.get_federal_reserve_rates()
+            market_rates = await self._rates()
+            
+            # Balances and rates as arrays, shared by the steps below
+            vectors = self._vectorize(cash_positions)
             
             # Calculate current portfolio yield
-            current_yield = self._calculate_portfolio_yield(cash_positions)
+            current_yield = self._calculate_portfolio_yield(cash_positions, vectors)
             
             # Run optimization algorithm
             optimal_allocation = self._optimize_cash_allocation(
-                cash_positions, market_rates, constraints
+                cash_positions, market_rates, constraints, vectors
             )
             
             # Calculate opportunity cost
@@ -80,7 +156,7 @@ class TreasuryAnalyticsEngine:
             
             # Generate recommendations
             recommendations = self._generate_cash_recommendations(
-                cash_positions, optimal_allocation, market_rates
+                cash_positions, optimal_allocation, market_rates, vectors
             )
             
             return OptimizationResult(
@@ -96,24 +172,46 @@ class TreasuryAnalyticsEngine:
             logger.error("Cash optimization failed", error=str(e))
             raise
     
-    def _calculate_portfolio_yield(self, positions: List[CashPosition]) -> Decimal:
+    def _position_float(self, position: CashPosition) -> Tuple[float, float]:
+        """Balance and interest rate (missing rate as 0) of a position as floats"""
+        balance, rate = position.balance, position.interest_rate
+        try:
+            entry = self._position_floats.get(position)
+        except TypeError:  # not weak-referenceable; convert without caching
+            return float(balance), float(rate or 0)
+        
+        if entry is None or entry[0] is not balance or entry[1] is not rate:
+            entry = (balance, rate, float(balance), float(rate or 0))
+            self._position_floats[position] = entry
+        return entry[2], entry[3]
+    
+    def _vectorize(self, positions: List[CashPosition]) -> Tuple[np.ndarray, np.ndarray]:
+        """Balances and interest rates (missing rates as 0) as float64 arrays"""
+        pairs = np.array([self._position_float(pos) for pos in positions], dtype=np.float64)
+        pairs = pairs.reshape(len(positions), 2)
+        return pairs[:, 0].copy(), pairs[:, 1].copy()
+    
+    def _calculate_portfolio_yield(
+        self,
+        positions: List[CashPosition],
+        vectors: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    ) -> Decimal:
         """Calculate weighted average yield of current positions"""
-        total_balance = sum(pos.balance for pos in positions)
+        balances, rates = vectors if vectors is not None else self._vectorize(positions)
+        total_balance = balances.sum()
         if total_balance == 0:
             return Decimal("0")
         
-        weighted_yield = sum(
-            pos.balance * (pos.interest_rate or Decimal("0")) 
-            for pos in positions
-        ) / total_balance
+        weighted_yield = float(balances @ rates) / total_balance
         
-        return weighted_yield
+        return Decimal(str(weighted_yield))
     
     def _optimize_cash_allocation(
         self,
         positions: List[CashPosition],
         market_rates: Dict[str, Any],
-        constraints: Optional[Dict[str, Any]] = None
+        constraints: Optional[Dict[str, Any]] = None,
+        vectors: Optional[Tuple[np.ndarray, np.ndarray]] = None
     ) -> Dict[str, Any]:
         """Core optimization algorithm using modern portfolio theory"""
         
@@ -127,44 +225,52 @@ class TreasuryAnalyticsEngine:
             }
         
         # Create optimization matrix
-        total_balance = sum(pos.balance for pos in positions)
+        _, rates = vectors if vectors is not None else self._vectorize(positions)
         n_positions = len(positions)
         
+        # Reuse the result for identical optimizer inputs (balances do not enter the optimization)
+        cache_key = (
+            tuple(
+                (pos.id, rate, pos.account_type.value, pos.liquidity_tier, pos.currency, pos.bank_name)
+                for pos, rate in zip(positions, rates.tolist())
+            ),
+            tuple(sorted(constraints.items()))
+        )
+        cached = self._optimization_cache.get(cache_key)
+        if cached is not None:
+            self._optimization_cache.move_to_end(cache_key)
+            return cached
+        
         # Yield vector (expected returns)
-        yields = np.array([
-            float(pos.interest_rate or 0) + self._get_market_adjustment(pos)
-            for pos in positions
-        ])
+        yields = rates + np.array([self._get_market_adjustment(pos) for pos in positions])
         
         # Risk matrix (simplified covariance)
         risk_matrix = self._build_risk_matrix(positions, market_rates)
         
-        # Constraint matrix
-        A_eq, b_eq = self._build_constraint_matrix(positions, constraints)
+        # Constraint matrices
+        lp_constraints = self._build_constraint_matrix(positions, constraints)
         
-        # Optimize using quadratic programming (simplified)
-        optimal_weights = self._solve_optimization(yields, risk_matrix, A_eq, b_eq)
+        # Optimize as a linear program (HiGHS)
+        optimal_weights = self._solve_optimization(yields, risk_matrix, lp_constraints)
         
         # Calculate optimal yield
-        optimal_yield = Decimal(str(np.dot(optimal_weights, yields)))
+        optimal_yield = Decimal(f"{float(optimal_weights @ yields):.10f}")
         
-        return {
+        optimization = {
             "optimal_weights": optimal_weights.tolist(),
             "optimal_yield": optimal_yield,
             "confidence": self._calculate_confidence(optimal_weights, risk_matrix),
             "risk_metrics": self._calculate_risk_metrics(optimal_weights, risk_matrix)
         }
+        
+        self._optimization_cache[cache_key] = optimization
+        if len(self._optimization_cache) > self.OPTIMIZATION_CACHE_SIZE:
+            self._optimization_cache.popitem(last=False)  # Least recently used
+        return optimization
     
     def _get_market_adjustment(self, position: CashPosition) -> float:
         """Get market-based yield adjustment for position type"""
-        adjustments = {
-            "checking": 0.0,
-            "savings": 0.5,
-            "money_market": 1.0,
-            "cd": 1.5,
-            "treasury": 2.0,
-        }
-        return adjustments.get(position.account_type.value, 0.0) / 100.0
+        return _MARKET_ADJ.get(position.account_type.value, 0.0) / 100.0
     
     def _build_risk_matrix(
         self, 
@@ -200,39 +306,54 @@ class TreasuryAnalyticsEngine:
         self, 
         positions: List[CashPosition], 
         constraints: Dict[str, Any]
-    ) -> Tuple[np.ndarray, np.ndarray]:
-        """Build constraint matrix for optimization"""
+    ) -> Dict[str, Any]:
+        """Build linear constraints for optimization (scipy linprog keyword arguments)"""
         n = len(positions)
         
-        # Equality constraint: weights sum to 1
-        A_eq = np.ones((1, n))
-        b_eq = np.array([1.0])
+        # Position cap, never below 1/n so the weights can still sum to 1
+        max_weight = max(float(constraints.get("max_single_position", 1.0)), 1.0 / n)
+        
+        # Immediate-tier floor, capped at what the immediate positions can hold
+        immediate = np.fromiter(
+            (pos.liquidity_tier == "immediate" for pos in positions), dtype=np.float64, count=n
+        )
+        min_immediate = min(
+            float(constraints.get("min_liquidity_tier_immediate", 0.0)),
+            max_weight * float(immediate.sum())
+        )
         
-        return A_eq, b_eq
+        return {
+            # Inequality constraint: -sum(w_immediate) <= -min_immediate
+            "A_ub": -immediate.reshape(1, n),
+            "b_ub": np.array([-min_immediate]),
+            # Equality constraint: weights sum to 1
+            "A_eq": np.ones((1, n)),
+            "b_eq": np.array([1.0]),
+            "bounds": (0.0, max_weight)
+        }
     
     def _solve_optimization(
         self,
         yields: np.ndarray,
         risk_matrix: np.ndarray,
-        A_eq: np.ndarray,
-        b_eq: np.ndarray
+        lp_constraints: Dict[str, Any]
     ) -> np.ndarray:
-        """Solve quadratic optimization problem"""
-        # Simplified optimization - in production would use scipy.optimize
-        n = len(yields)
+        """Maximize portfolio yield subject to the allocation constraints"""
+        result = linprog(-yields, method="highs", **lp_constraints)
+        if result.success:
+            return result.x
         
-        # Equal weight as baseline
-        weights = np.ones(n) / n
+        logger.warning("Allocation LP not solved, using yield-weighted allocation", status=result.message)
+        n = len(yields)
         
         # Adjust based on yield differentials
-        yield_scores = (yields - np.mean(yields)) / np.std(yields) if np.std(yields) > 0 else np.zeros(n)
-        
-        # Apply yield-based adjustments
-        for i in range(n):
-            weights[i] *= (1.0 + yield_scores[i] * 0.1)
+        yield_std = yields.std()
+        yield_scores = (yields - yields.mean()) / yield_std if yield_std > 0 else np.zeros(n)
         
-        # Normalize to sum to 1
-        weights = weights / np.sum(weights)
+        # Equal-weight baseline with yield-based adjustments, normalized to sum to 1
+        # (the 1/n baseline cancels in the normalization)
+        weights = 1.0 + 0.1 * yield_scores
+        weights /= weights.sum()
         
         return weights
     
@@ -263,21 +384,26 @@ class TreasuryAnalyticsEngine:
         self,
         positions: List[CashPosition],
         optimization: Dict[str, Any],
-        market_rates: Dict[str, Any]
+        market_rates: Dict[str, Any],
+        vectors: Optional[Tuple[np.ndarray, np.ndarray]] = None
     ) -> List[Dict[str, Any]]:
         """Generate actionable recommendations"""
         recommendations = []
         optimal_weights = optimization["optimal_weights"]
         
-        total_balance = sum(pos.balance for pos in positions)
+        balances, rates = vectors if vectors is not None else self._vectorize(positions)
+        total_balance = float(balances.sum())
+        current_weights = (balances / total_balance).tolist()
+        balance_list = balances.tolist()
+        rate_list = rates.tolist()
         
         for i, position in enumerate(positions):
-            current_weight = float(position.balance / total_balance)
+            current_weight = current_weights[i]
             optimal_weight = optimal_weights[i]
             
             if abs(optimal_weight - current_weight) > 0.05:  # 5% threshold
-                target_balance = Decimal(str(optimal_weight)) * total_balance
-                difference = target_balance - position.balance
+                target_balance = optimal_weight * total_balance
+                difference = target_balance - balance_list[i]
                 
                 action = "increase" if difference > 0 else "decrease"
                 
@@ -285,21 +411,18 @@ class TreasuryAnalyticsEngine:
                     "position_id": position.id,
                     "account_name": position.account_name,
                     "action": action,
-                    "current_balance": float(position.balance),
+                    "current_balance": balance_list[i],
                     "target_balance": float(target_balance),
                     "amount_change": float(abs(difference)),
                     "expected_yield_impact": float(
-                        (optimal_weight - current_weight) * 
-                        float(position.interest_rate or Decimal("0"))
+                        (optimal_weight - current_weight) * rate_list[i]
                     ),
-                    "priority": "high" if abs(difference) > total_balance * Decimal("0.1") else "medium",
+                    "priority": "high" if abs(difference) > total_balance * 0.1 else "medium",
                     "rationale": f"Optimize yield by {action}ing allocation to {position.account_type.value}"
                 })
         
-        # Sort by expected impact
-        recommendations.sort(key=lambda x: abs(x["expected_yield_impact"]), reverse=True)
-        
-        return recommendations[:10]  # Top 10 recommendations
+        # Top 10 recommendations by expected impact
+        return heapq.nlargest(10, recommendations, key=lambda x: abs(x["expected_yield_impact"]))
     
     async def forecast_cash_flow(
         self,
@@ -460,14 +583,15 @@ class TreasuryAnalyticsEngine:
         Property 3: Liquidity Shortfall Response
         """
         try:
-            # Calculate current liquidity metrics
-            total_cash = sum(pos.balance for pos in cash_positions)
-            immediate_liquidity = sum(
-                pos.balance for pos in cash_positions 
-                if pos.liquidity_tier == "immediate"
+            # Calculate current liquidity metrics (floats; Decimal only in the result)
+            balances, _ = self._vectorize(cash_positions)
+            immediate = np.fromiter(
+                (pos.liquidity_tier == "immediate" for pos in cash_positions), dtype=bool, count=len(cash_positions)
             )
+            total_cash = float(balances.sum())
+            immediate_liquidity = float(balances[immediate].sum())
             
-            current_liquidity_ratio = float(immediate_liquidity / total_cash) if total_cash > 0 else 0.0
+            current_liquidity_ratio = immediate_liquidity / total_cash if total_cash > 0 else 0.0
             
             # Default projected outflows if not provided
             if not projected_outflows:
@@ -494,7 +618,7 @@ class TreasuryAnalyticsEngine:
                 max(stress_test_results.values()) if stress_test_results else 0
             )
             
-            liquidity_gap = immediate_liquidity - Decimal(str(worst_case_outflow))
+            liquidity_gap = immediate_liquidity - worst_case_outflow
             
             # Determine recommended buffer
             recommended_buffer = self._calculate_recommended_liquidity_buffer(
@@ -509,18 +633,20 @@ class TreasuryAnalyticsEngine:
             return LiquidityAnalysis(
                 current_liquidity_ratio=current_liquidity_ratio,
                 stress_test_results=stress_test_results,
-                liquidity_gap=liquidity_gap,
-                recommended_buffer=recommended_buffer,
-                risk_level=risk_level
+                liquidity_gap=_to_cents(liquidity_gap),
+                recommended_buffer=_to_cents(recommended_buffer),
+                risk_level=risk_level,
+                total_cash=_to_cents(total_cash),
+                immediate_liquidity=_to_cents(immediate_liquidity)
             )
             
         except Exception as e:
             logger.error("Liquidity analysis failed", error=str(e))
             raise
     
-    def _generate_default_outflow_projections(self, total_cash: Decimal) -> List[Dict[str, Any]]:
+    def _generate_default_outflow_projections(self, total_cash: float) -> List[Dict[str, Any]]:
         """Generate default outflow projections based on total cash"""
-        base_daily_outflow = float(total_cash) * 0.02  # 2% daily outflow assumption
+        base_daily_outflow = total_cash * 0.02  # 2% daily outflow assumption
         
         return [
             {
@@ -576,19 +702,19 @@ class TreasuryAnalyticsEngine:
     
     def _calculate_recommended_liquidity_buffer(
         self,
-        total_cash: Decimal,
+        total_cash: float,
         stress_results: Dict[str, float]
-    ) -> Decimal:
+    ) -> float:
         """Calculate recommended liquidity buffer"""
         # Base buffer: 10% of total cash
-        base_buffer = total_cash * Decimal("0.10")
+        base_buffer = total_cash * 0.10
         
         # Stress-based buffer: cover worst-case scenario
         if stress_results:
             worst_case = max(stress_results.values())
-            stress_buffer = Decimal(str(worst_case * 1.2))  # 20% margin above worst case
+            stress_buffer = worst_case * 1.2  # 20% margin above worst case
         else:
-            stress_buffer = total_cash * Decimal("0.05")
+            stress_buffer = total_cash * 0.05
         
         # Return the higher of the two
         return max(base_buffer, stress_buffer)
@@ -596,8 +722,8 @@ class TreasuryAnalyticsEngine:
     def _assess_liquidity_risk_level(
         self,
         liquidity_ratio: float,
-        liquidity_gap: Decimal,
-        recommended_buffer: Decimal
+        liquidity_gap: float,
+        recommended_buffer: float
     ) -> str:
         """Assess overall liquidity risk level"""
         # Risk factors
@@ -622,21 +748,16 @@ class TreasuryAnalyticsEngine:
         Property 1: Cash Optimization Detection
         """
         try:
-            opportunities = []
-            
             # Get current market rates for comparison
-            market_rates = await self.market_data.get_federal_reserve_rates()
+            market_rates = await self._rates()
             
-            # Analyze each position for optimization potential
-            for position in cash_positions:
-                opportunity = await self._analyze_position_opportunity(
-                    position, market_rates, threshold_amount
-                )
-                if opportunity:
-                    opportunities.append(opportunity)
+            # Analyze all positions for optimization potential in one pass
+            opportunities = self._analyze_position_opportunities(
+                cash_positions, market_rates, threshold_amount
+            )
             
             # Sort by opportunity cost (highest first)
-            opportunities.sort(key=lambda x: x["opportunity_cost"], reverse=True)
+            opportunities.sort(key=itemgetter("opportunity_cost"), reverse=True)
             
             return opportunities
             
@@ -644,71 +765,62 @@ class TreasuryAnalyticsEngine:
             logger.error("Opportunity detection failed", error=str(e))
             raise
     
-    async def _analyze_position_opportunity(
+    def _analyze_position_opportunities(
         self,
-        position: CashPosition,
+        positions: List[CashPosition],
         market_rates: Dict[str, Any],
         threshold: Decimal
-    ) -> Optional[Dict[str, Any]]:
-        """Analyze individual position for optimization opportunity"""
-        current_rate = position.interest_rate or Decimal("0")
-        
-        # Get benchmark rate for position type
-        benchmark_rate = self._get_benchmark_rate(position, market_rates)
+    ) -> List[Dict[str, Any]]:
+        """Analyze positions for optimization opportunities above threshold"""
+        balances, current_rates = self._vectorize(positions)
         
-        # Calculate opportunity cost
-        rate_differential = benchmark_rate - current_rate
-        annual_opportunity_cost = position.balance * rate_differential
+        # Get benchmark rate for each position type
+        benchmark_rates_f = np.fromiter(
+            (self._get_benchmark_rate(position, market_rates) for position in positions),
+            dtype=np.float64, count=len(positions)
+        )
         
-        # Only flag if above threshold
-        if annual_opportunity_cost >= threshold:
-            return {
+        # Calculate opportunity costs
+        rate_differentials = benchmark_rates_f - current_rates
+        opportunity_costs = balances * rate_differentials
+        
+        # Only flag positions above threshold
+        threshold_f = float(threshold)
+        analysis_date = datetime.now().isoformat()
+        opportunities = []
+        for i in np.flatnonzero(opportunity_costs >= threshold_f).tolist():
+            position = positions[i]
+            opportunity_cost = float(opportunity_costs[i])
+            opportunities.append({
                 "position_id": position.id,
                 "account_name": position.account_name,
-                "current_balance": float(position.balance),
-                "current_rate": float(current_rate),
-                "benchmark_rate": float(benchmark_rate),
-                "rate_differential": float(rate_differential),
-                "opportunity_cost": float(annual_opportunity_cost),
-                "recommended_action": self._get_recommended_action(position, benchmark_rate),
-                "priority": "high" if annual_opportunity_cost >= threshold * 5 else "medium",
-                "analysis_date": datetime.now().isoformat()
-            }
+                "current_balance": float(balances[i]),
+                "current_rate": float(current_rates[i]),
+                "benchmark_rate": float(benchmark_rates_f[i]),
+                "rate_differential": float(rate_differentials[i]),
+                "opportunity_cost": opportunity_cost,
+                "recommended_action": self._get_recommended_action(position, benchmark_rates_f[i]),
+                "priority": "high" if opportunity_cost >= threshold_f * 5 else "medium",
+                "analysis_date": analysis_date
+            })
         
-        return None
+        return opportunities
     
     def _get_benchmark_rate(
         self,
         position: CashPosition,
         market_rates: Dict[str, Any]
-    ) -> Decimal:
+    ) -> float:
         """Get appropriate benchmark rate for position type"""
-        # Map account types to market rate benchmarks
-        rate_mapping = {
-            "checking": "fed_funds",
-            "savings": "treasury_3m",
-            "money_market": "treasury_6m",
-            "cd": "treasury_1y",
-            "treasury": "treasury_2y"
-        }
-        
-        benchmark_key = rate_mapping.get(position.account_type.value, "fed_funds")
-        
-        if benchmark_key in market_rates:
-            return market_rates[benchmark_key].rate
-        else:
-            # Default benchmark rates if market data unavailable
-            default_rates = {
-                "checking": Decimal("0.01"),
-                "savings": Decimal("2.50"),
-                "money_market": Decimal("3.00"),
-                "cd": Decimal("4.00"),
-                "treasury": Decimal("4.50")
-            }
-            return default_rates.get(position.account_type.value, Decimal("2.00"))
+        account_type = position.account_type.value
+        rate = market_rates.get(_RATE_MAPPING.get(account_type, "fed_funds"))
+        if rate is not None:
+            return float(rate.rate)
+        return _DEFAULT_RATES_F.get(account_type, 2.0)
     
-    def _get_recommended_action(self, position: CashPosition, benchmark_rate: Decimal) -> str:
+    def _get_recommended_action(self, position: CashPosition, benchmark_rate: float) -> str:
         """Get recommended action for position optimization"""
+        benchmark_rate = Decimal(repr(float(benchmark_rate)))
         current_rate = position.interest_rate or Decimal("0")
         
         if benchmark_rate > current_rate * Decimal("1.5"):  # 50% better rate available
@@ -730,7 +842,8 @@ class TreasuryAnalyticsEngine:
         """
         try:
             # Get current market rates
-            current_market_rates = await self.market_data.get_federal_reserve_rates()
+            # Always fetch fresh rates here; this also refreshes the cache for the recalculation
+            current_market_rates = await self._rates(force_refresh=True)
             
             # Check if market has changed significantly
             if not self._has_significant_market_change(
@@ -2,8 +2,9 @@
 Data quality validation and anomaly detection service
 """
 
+import math
 import numpy as np
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Sequence
 from decimal import Decimal
 from datetime import datetime, timedelta
 import structlog
@@ -66,6 +67,34 @@ class DataQualityReport:
         return [issue for issue in self.issues if issue.severity == DataQualitySeverity.HIGH]
 
 
+# Score penalty per issue, by severity
+_SEVERITY_WEIGHTS = {
+    DataQualitySeverity.CRITICAL: 25,
+    DataQualitySeverity.HIGH: 10,
+    DataQualitySeverity.MEDIUM: 5,
+    DataQualitySeverity.LOW: 1
+}
+
+
+def _score_series(values: Sequence[float]) -> Tuple[float, float, float]:
+    """Mean, standard deviation and log-return volatility of a rate series
+
+    Log-return volatility is 0.0 when the series has a non-positive value.
+    """
+    arr = np.asarray(values, dtype=np.float64)
+    mean = arr.mean()
+    deviations = arr - mean
+    std = np.sqrt(deviations.dot(deviations) / arr.size)
+    
+    log_return_std = 0.0
+    if arr.size >= 2 and arr.min() > 0:
+        returns = np.diff(np.log(arr))
+        returns -= returns.mean()
+        log_return_std = np.sqrt(returns.dot(returns) / returns.size)
+    
+    return float(mean), float(std), float(log_return_std)
+
+
 class DataQualityService:
     """Service for validating data quality and detecting anomalies"""
     
@@ -138,6 +167,58 @@ class DataQualityService:
             passed_validation=passed_validation
         )
     
+    async def validate_and_score(
+        self,
+        data: Dict[str, Any],
+        source: str,
+        historical_data: Optional[Sequence[Dict[str, Any]]] = None
+    ) -> DataQualityReport:
+        """
+        Validate market data, detect anomalies against history and score it in a single
+        pass over the sections. Anomaly checks run only when history is provided.
+        """
+        issues = []
+        total_records = 0
+        total_penalty = 0
+        critical_count = 0
+        check_anomalies = historical_data is not None and len(historical_data) >= 5
+        
+        sections = (
+            ("interest_rates", self._validate_interest_rates, self._detect_rate_anomalies),
+            ("exchange_rates", self._validate_exchange_rates, self._detect_fx_anomalies),
+            ("yield_curve", self._validate_yield_curve, None),
+        )
+        
+        for section, validate, detect in sections:
+            if section not in data:
+                continue
+            
+            section_issues, count = validate(data[section])
+            if detect and check_anomalies:
+                section_issues.extend(detect(
+                    data[section], [h.get(section, {}) for h in historical_data]
+                ))
+            
+            # Accumulate the score inputs while the section's issues are at hand
+            for issue in section_issues:
+                total_penalty += _SEVERITY_WEIGHTS[issue.severity]
+                if issue.severity == DataQualitySeverity.CRITICAL:
+                    critical_count += 1
+            
+            issues.extend(section_issues)
+            total_records += count
+        
+        quality_score = self._score_from_penalty(total_penalty, total_records)
+        
+        return DataQualityReport(
+            source=source,
+            timestamp=datetime.now(),
+            total_records=total_records,
+            issues=issues,
+            quality_score=quality_score,
+            passed_validation=quality_score >= 80.0 and critical_count == 0
+        )
+    
     def _validate_interest_rates(self, rates: Dict[str, Any]) -> Tuple[List[DataQualityIssue], int]:
         """Validate interest rate data"""
         issues = []
@@ -319,19 +400,15 @@ class DataQualityService:
     
     def _calculate_quality_score(self, issues: List[DataQualityIssue], total_records: int) -> float:
         """Calculate overall data quality score (0-100)"""
+        total_penalty = sum(_SEVERITY_WEIGHTS[issue.severity] for issue in issues)
+        return self._score_from_penalty(total_penalty, total_records)
+    
+    def _score_from_penalty(self, total_penalty: float, total_records: int) -> float:
+        """Convert a severity-weighted penalty into a 0-100 quality score"""
         if total_records == 0:
             return 0.0
         
-        # Weight issues by severity
-        severity_weights = {
-            DataQualitySeverity.CRITICAL: 25,
-            DataQualitySeverity.HIGH: 10,
-            DataQualitySeverity.MEDIUM: 5,
-            DataQualitySeverity.LOW: 1
-        }
-        
-        total_penalty = sum(severity_weights[issue.severity] for issue in issues)
-        max_possible_penalty = total_records * severity_weights[DataQualitySeverity.CRITICAL]
+        max_possible_penalty = total_records * _SEVERITY_WEIGHTS[DataQualitySeverity.CRITICAL]
         
         # Calculate score (higher is better)
         if max_possible_penalty == 0:
@@ -342,7 +419,7 @@ class DataQualityService:
         
         return round(score, 2)
     
-    async def detect_anomalies(self, current_data: Dict[str, Any], historical_data: List[Dict[str, Any]]) -> List[DataQualityIssue]:
+    async def detect_anomalies(self, current_data: Dict[str, Any], historical_data: Sequence[Dict[str, Any]]) -> List[DataQualityIssue]:
         """Detect anomalies by comparing current data with historical patterns"""
         anomalies = []
         
@@ -391,8 +468,7 @@ class DataQualityService:
                 continue
             
             # Calculate statistical measures
-            mean_rate = np.mean(historical_values)
-            std_rate = np.std(historical_values)
+            mean_rate, std_rate, _ = _score_series(historical_values)
             
             # Z-score anomaly detection (3-sigma rule)
             if std_rate > 0:
@@ -433,13 +509,26 @@ class DataQualityService:
             
             # Calculate daily volatility
             if len(historical_values) >= 2:
-                returns = np.diff(np.log(historical_values))
-                volatility = np.std(returns)
+                _, _, volatility = _score_series(historical_values)
                 
                 # Check if current rate represents a large move
                 if len(historical_values) > 0:
                     last_rate = historical_values[-1]
-                    daily_return = abs(np.log(current_rate / last_rate))
+                    
+                    # A non-positive quote has no log return; report it rather than raising
+                    if current_rate <= 0:
+                        anomalies.append(DataQualityIssue(
+                            issue_type=DataQualityIssueType.OUTLIER,
+                            severity=DataQualitySeverity.CRITICAL,
+                            field_name=f"{currency}.rate",
+                            value=current_rate,
+                            message=f"Non-positive FX rate: {current_rate}"
+                        ))
+                        continue
+                    if last_rate <= 0:
+                        continue
+                    
+                    daily_return = abs(math.log(current_rate / last_rate))
                     
                     # If move is more than 3x daily volatility, flag as anomaly
                     if volatility > 0 and daily_return > 3 * volatility:
@@ -5,6 +5,7 @@ Comprehensive data ingestion from multiple financial data sources
 
 import asyncio
 import aiohttp
+import orjson
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
@@ -74,7 +75,7 @@ class TreasuryDataIngestion:
             async with aiohttp.ClientSession() as session:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = await response.json(loads=orjson.loads)
                         return {
                             'source': 'treasury_gov',
                             'data_type': 'cash_balances',
@@ -229,7 +230,7 @@ class TreasuryDataIngestion:
             async with aiohttp.ClientSession() as session:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = await response.json(loads=orjson.loads)
                         return data.get('observations', [])
                     else:
                         logger.error(f"FRED API error for {series_id}: {response.status}")
@@ -254,7 +255,7 @@ class TreasuryDataIngestion:
             async with aiohttp.ClientSession() as session:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = await response.json(loads=orjson.loads)
                         # Process Alpha Vantage response
                         return self._process_alpha_vantage_treasury(data)
                     else:
@@ -300,7 +301,7 @@ class TreasuryDataIngestion:
             async with aiohttp.ClientSession() as session:
                 async with session.get(url) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = await response.json(loads=orjson.loads)
                         rates = data.get('rates', {})
                         return {currency: rates.get(currency, 0.0) for currency in targets}
                     else:
@@ -0,0 +1,46 @@
+"""
+Projections of market data objects into JSON-ready records
+
+Kept free of service dependencies and fully typed so the module can be
+compiled ahead of time (e.g. with mypyc) without changes.
+"""
+
+from typing import Dict, List, Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.services.market_data import InterestRate, ExchangeRate, TreasuryYield
+
+
+def to_rate_records(rates: "Dict[str, InterestRate]") -> Dict[str, Dict[str, Any]]:
+    """Project interest rates to {name: {rate, date, source}} records"""
+    records: Dict[str, Dict[str, Any]] = {}
+    for name, rate in rates.items():
+        records[name] = {
+            "rate": rate.rate,
+            "date": rate.date.isoformat(),
+            "source": rate.source
+        }
+    return records
+
+
+def to_fx_records(rates: "Dict[str, ExchangeRate]") -> Dict[str, Dict[str, Any]]:
+    """Project exchange rates to {currency: {rate, timestamp, source, ...}} records"""
+    records: Dict[str, Dict[str, Any]] = {}
+    for currency, rate in rates.items():
+        records[currency] = {
+            "rate": rate.rate,
+            "timestamp": rate.timestamp.isoformat(),
+            "source": rate.source,
+            "base_currency": rate.base_currency,
+            "target_currency": rate.target_currency
+        }
+    return records
+
+
+def to_yield_records(yield_curve: "List[TreasuryYield]") -> List[Dict[str, Any]]:
+    """Project a yield curve to [{maturity, yield, date}] records"""
+    return [{
+        "maturity": yc.maturity,
+        "yield": yc.yield_rate,
+        "date": yc.date.isoformat()
+    } for yc in yield_curve]
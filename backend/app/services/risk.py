@@ -2,11 +2,20 @@
 Risk Calculation Service - VaR, Credit Risk, and Market Risk Analysis
 """
 
+import asyncio
+import hashlib
+import math
+import time
 import numpy as np
-from typing import List, Dict, Optional, Any, Tuple
-from decimal import Decimal
+from scipy.stats import norm
+from typing import List, Dict, Optional, Any, Tuple, NamedTuple
+from decimal import Decimal, ROUND_HALF_EVEN
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import chain
+from types import MappingProxyType
 import structlog
 
 from app.models import CashPosition, Investment, FXExposure, RiskMetrics
@@ -14,6 +23,97 @@ from app.services.market_data import MarketDataService
 
 logger = structlog.get_logger(__name__)
 
+# Risk weight lookup tables
+_CASH_WEIGHTS = MappingProxyType({
+    "checking": 0.01,
+    "savings": 0.01,
+    "money_market": 0.02,
+    "cd": 0.03,
+    "treasury": 0.005
+})
+
+_TYPE_WEIGHTS = MappingProxyType({
+    "treasury_bill": 0.005,
+    "treasury_note": 0.01,
+    "treasury_bond": 0.02,
+    "corporate_bond": 0.05,
+    "money_market_fund": 0.01,
+    "cd": 0.02,
+    "commercial_paper": 0.03
+})
+
+_RATING_ADJ = MappingProxyType({
+    "AAA": 0.8, "AA+": 0.9, "AA": 1.0, "AA-": 1.1,
+    "A+": 1.2, "A": 1.3, "A-": 1.4,
+    "BBB+": 1.6, "BBB": 1.8, "BBB-": 2.0,
+    "BB+": 2.5, "BB": 3.0, "BB-": 3.5,
+    "B+": 4.0, "B": 5.0, "B-": 6.0,
+    "CCC": 8.0, "CC": 10.0, "C": 12.0, "D": 15.0
+})
+
+# FX volatilities by currency pair: the single source for risk weights and currency VaR
+_FX_ANNUAL_VOL = MappingProxyType({
+    ("USD", "EUR"): 0.12,
+    ("USD", "GBP"): 0.14,
+    ("USD", "JPY"): 0.16,
+    ("USD", "CAD"): 0.10,
+    ("USD", "AUD"): 0.18,
+    ("USD", "CHF"): 0.11,
+    ("USD", "SGD"): 0.08
+})
+_DEFAULT_FX_ANNUAL_VOL = 0.15
+
+# Daily equivalents (252 trading days per year)
+_FX_DAILY_VOL = MappingProxyType({pair: vol / math.sqrt(252) for pair, vol in _FX_ANNUAL_VOL.items()})
+_DEFAULT_FX_DAILY_VOL = _DEFAULT_FX_ANNUAL_VOL / math.sqrt(252)
+
+# Simplified currency correlations, keyed by alphabetically ordered pair
+_CURRENCY_CORRELATIONS = MappingProxyType({
+    tuple(sorted(pair)): correlation for pair, correlation in {
+        ("EUR", "GBP"): 0.7,
+        ("EUR", "CHF"): 0.8,
+        ("GBP", "CHF"): 0.6,
+        ("JPY", "CHF"): 0.3,
+        ("CAD", "AUD"): 0.6,
+        ("SGD", "JPY"): 0.4,
+    }.items()
+})
+_DEFAULT_CURRENCY_CORRELATION = 0.3
+
+
+_CENT = Decimal("0.01")
+
+
+def _to_cents(amount: float) -> Decimal:
+    """Monetary float as a Decimal rounded to cents, via its shortest repr (2.675 -> 2.68)"""
+    return Decimal(repr(float(amount))).quantize(_CENT, rounding=ROUND_HALF_EVEN)
+
+
+# Stress scenarios as parallel arrays of rate change and FX impact
+STRESS_SCENARIOS = (
+    "interest_rate_shock_up",
+    "interest_rate_shock_down",
+    "fx_crisis",
+    "credit_crisis",
+    "liquidity_crisis"
+)
+STRESS_RATE_CHANGES = np.array([0.02, -0.02, 0.01, 0.03, 0.05])
+STRESS_FX_IMPACTS = np.array([0.05, -0.03, 0.20, 0.10, 0.15])
+
+
+# Component types, indexed by PortfolioArrays.kinds
+COMPONENT_TYPES = ("cash", "investments", "fx")
+CASH, INVESTMENTS, FX = range(len(COMPONENT_TYPES))
+
+
+class PortfolioArrays(NamedTuple):
+    """Portfolio positions as parallel arrays, one row per position"""
+    values: np.ndarray        # Balance, market value, or FX notional
+    risk_weights: np.ndarray
+    hedge_ratios: np.ndarray  # Zero for non-FX positions
+    kinds: np.ndarray         # Index into COMPONENT_TYPES
+    total: float              # Cash plus investments (FX notionals excluded)
+
 
 @dataclass
 class VaRResult:
@@ -53,9 +153,22 @@ class CreditRiskScore:
 class RiskCalculationService:
     """Advanced risk calculation and monitoring service"""
     
-    def __init__(self, market_data_service: MarketDataService):
+    VAR_CACHE_SIZE = 256
+    RISK_CACHE_SIZE = 64  # Each entry is an n_assets x n_assets matrix
+    VAR_CACHE_TTL_SECONDS = 30
+    
+    # Supported VaR methods and the calculation_method label each one reports
+    VAR_METHODS = {"parametric": "Parametric", "monte_carlo": "Monte Carlo"}
+    
+    def __init__(self, market_data_service: MarketDataService, simulation_seed: int = 42):
         self.market_data = market_data_service
-        self._risk_cache: Dict[str, Any] = {}
+        self._simulation_seed = simulation_seed  # Monte Carlo draws are reproducible per seed
+        
+        # Shape-dependent matrices keyed by (kind, n_assets): "correlation", "cholesky"
+        self._risk_cache: "OrderedDict[Tuple[str, int], np.ndarray]" = OrderedDict()
+        
+        # VaR results keyed by portfolio digest and time bucket, for back-to-back refreshes
+        self._var_cache: "OrderedDict[Tuple[bytes, int], VaRResult]" = OrderedDict()
     
     async def calculate_portfolio_var(
         self,
@@ -63,170 +176,209 @@ class RiskCalculationService:
         investments: List[Investment],
         fx_exposures: List[FXExposure],
         confidence_level: float = 0.95,
-        time_horizon: int = 1
+        time_horizon: int = 1,
+        method: str = "parametric"
     ) -> VaRResult:
         """
-        Calculate Value at Risk using Monte Carlo simulation
+        Calculate Value at Risk, analytically ("parametric") or by Monte Carlo simulation ("monte_carlo")
         Property 9: Continuous VaR Monitoring
         """
+        if method not in self.VAR_METHODS:
+            raise ValueError(f"Unknown VaR method {method!r}; expected one of {sorted(self.VAR_METHODS)}")
+        
         try:
-            # Get market data for risk calculations
-            market_data = await self.market_data.get_market_summary()
-            
             # Build portfolio components
             portfolio_components = self._build_portfolio_components(
                 cash_positions, investments, fx_exposures
             )
             
-            # Run Monte Carlo simulation
-            var_results = self._monte_carlo_var_simulation(
-                portfolio_components, market_data, confidence_level, time_horizon
+            cache_key = (
+                self._var_cache_digest(portfolio_components, confidence_level, time_horizon, method),
+                int(time.time() // self.VAR_CACHE_TTL_SECONDS)
             )
+            cached = self._var_cache.get(cache_key)
+            if cached is not None:
+                self._var_cache.move_to_end(cache_key)
+                return cached
+            
+            # Get market data for risk calculations
+            market_data = await self.market_data.get_market_summary()
+            
+            # Closed-form VaR for the normal shock model; simulation on request
+            if method == "monte_carlo":
+                # Simulation is CPU-bound: run it off the event loop
+                loop = asyncio.get_running_loop()
+                var_results = await loop.run_in_executor(
+                    None, self._monte_carlo_var_simulation,
+                    portfolio_components, market_data, confidence_level, time_horizon
+                )
+            else:
+                var_results = self._parametric_var(
+                    portfolio_components, confidence_level, time_horizon
+                )
             
             # Calculate component VaRs
             component_vars = self._calculate_component_vars(
                 portfolio_components, var_results
             )
             
-            # Run stress tests
-            stress_results = self._run_stress_tests(
-                portfolio_components, market_data
-            )
+            # Run stress tests (a few vector ops; cheaper inline than in an executor)
+            stress_results = self._run_stress_tests(portfolio_components, market_data)
             
-            return VaRResult(
-                portfolio_var_1d=Decimal(str(var_results["var_1d"])),
-                portfolio_var_10d=Decimal(str(var_results["var_10d"])),
-                expected_shortfall=Decimal(str(var_results["expected_shortfall"])),
+            var_result = VaRResult(
+                portfolio_var_1d=_to_cents(var_results["var_1d"]),
+                portfolio_var_10d=_to_cents(var_results["var_10d"]),
+                expected_shortfall=_to_cents(var_results["expected_shortfall"]),
                 confidence_level=confidence_level,
-                calculation_method="Monte Carlo",
+                calculation_method=self.VAR_METHODS[method],
                 component_vars=component_vars,
                 stress_test_results=stress_results
             )
             
+            self._var_cache[cache_key] = var_result
+            if len(self._var_cache) > self.VAR_CACHE_SIZE:
+                self._var_cache.popitem(last=False)  # Least recently used, including stale buckets
+            return var_result
+            
         except Exception as e:
             logger.error("VaR calculation failed", error=str(e))
             raise
     
+    @staticmethod
+    def _var_cache_digest(
+        portfolio_components: PortfolioArrays,
+        confidence_level: float,
+        time_horizon: int,
+        method: str
+    ) -> bytes:
+        """Digest of everything a VaR result depends on"""
+        digest = hashlib.blake2b(digest_size=16)
+        for column in (
+            portfolio_components.values,
+            portfolio_components.risk_weights,
+            portfolio_components.hedge_ratios,
+            portfolio_components.kinds
+        ):
+            digest.update(column.tobytes())
+        digest.update(f"{confidence_level!r}|{time_horizon}|{method}".encode())
+        return digest.digest()
+    
     def _build_portfolio_components(
         self,
         cash_positions: List[CashPosition],
         investments: List[Investment], 
         fx_exposures: List[FXExposure]
-    ) -> Dict[str, Any]:
+    ) -> PortfolioArrays:
         """Build portfolio components for risk calculation"""
-        components = {
-            "cash": [],
-            "investments": [],
-            "fx": [],
-            "total_value": Decimal("0")
-        }
-        
-        # Process cash positions
-        for pos in cash_positions:
-            components["cash"].append({
-                "id": pos.id,
-                "value": pos.balance,
-                "currency": pos.currency,
-                "interest_rate": pos.interest_rate or Decimal("0"),
-                "liquidity_tier": pos.liquidity_tier.value,
-                "risk_weight": self._get_cash_risk_weight(pos)
-            })
-            components["total_value"] += pos.balance
-        
-        # Process investments
-        for inv in investments:
-            market_value = inv.market_value or inv.principal_amount
-            components["investments"].append({
-                "id": inv.id,
-                "value": market_value,
-                "currency": inv.currency,
-                "instrument_type": inv.instrument_type.value,
-                "credit_rating": inv.credit_rating.value if inv.credit_rating else "NR",
-                "duration": inv.duration or Decimal("0"),
-                "yield_to_maturity": inv.yield_to_maturity or Decimal("0"),
-                "risk_weight": self._get_investment_risk_weight(inv)
-            })
-            components["total_value"] += market_value
-        
-        # Process FX exposures
-        for fx in fx_exposures:
-            components["fx"].append({
-                "id": fx.id,
-                "notional": fx.notional_amount,
-                "base_currency": fx.base_currency,
-                "exposure_currency": fx.exposure_currency,
-                "hedge_ratio": fx.hedge_ratio,
-                "spot_rate": fx.spot_rate,
-                "risk_weight": self._get_fx_risk_weight(fx)
-            })
-        
-        return components
+        n_cash, n_inv, n_fx = len(cash_positions), len(investments), len(fx_exposures)
+        n_positions = n_cash + n_inv + n_fx
+        
+        # Cash balances, investment market values (principal if unpriced) and FX notionals,
+        # coerced to float straight into each column
+        values = np.fromiter(chain(
+            (float(pos.balance) for pos in cash_positions),
+            (float(inv.market_value or inv.principal_amount) for inv in investments),
+            (float(fx.notional_amount) for fx in fx_exposures)
+        ), dtype=np.float64, count=n_positions)
+        risk_weights = np.fromiter(chain(
+            map(self._get_cash_risk_weight, cash_positions),
+            map(self._get_investment_risk_weight, investments),
+            map(self._get_fx_risk_weight, fx_exposures)
+        ), dtype=np.float64, count=n_positions)
+        
+        hedge_ratios = np.zeros(n_positions, dtype=np.float64)
+        hedge_ratios[n_cash + n_inv:] = np.fromiter(
+            (float(fx.hedge_ratio) for fx in fx_exposures), dtype=np.float64, count=n_fx
+        )
+        
+        kinds = np.repeat(np.arange(len(COMPONENT_TYPES), dtype=np.int8), (n_cash, n_inv, n_fx))
+        
+        return PortfolioArrays(
+            values=values,
+            risk_weights=risk_weights,
+            hedge_ratios=hedge_ratios,
+            kinds=kinds,
+            total=math.fsum(values[:n_cash + n_inv].tolist())
+        )
     
     def _get_cash_risk_weight(self, position: CashPosition) -> float:
         """Get risk weight for cash position"""
-        weights = {
-            "checking": 0.01,
-            "savings": 0.01,
-            "money_market": 0.02,
-            "cd": 0.03,
-            "treasury": 0.005
-        }
-        return weights.get(position.account_type.value, 0.02)
+        return _CASH_WEIGHTS.get(position.account_type.value, 0.02)
     
     def _get_investment_risk_weight(self, investment: Investment) -> float:
         """Get risk weight for investment"""
+        rating = investment.credit_rating.value if investment.credit_rating else None
+        return self._investment_risk_weight(investment.instrument_type.value, rating)
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _investment_risk_weight(instrument_type: str, credit_rating: Optional[str]) -> float:
+        """Risk weight for an (instrument type, credit rating) pair"""
         # Base weight by instrument type
-        type_weights = {
-            "treasury_bill": 0.005,
-            "treasury_note": 0.01,
-            "treasury_bond": 0.02,
-            "corporate_bond": 0.05,
-            "money_market_fund": 0.01,
-            "cd": 0.02,
-            "commercial_paper": 0.03
-        }
-        
-        base_weight = type_weights.get(investment.instrument_type.value, 0.05)
+        base_weight = _TYPE_WEIGHTS.get(instrument_type, 0.05)
         
         # Adjust for credit rating
-        if investment.credit_rating:
-            rating_adjustments = {
-                "AAA": 0.8, "AA+": 0.9, "AA": 1.0, "AA-": 1.1,
-                "A+": 1.2, "A": 1.3, "A-": 1.4,
-                "BBB+": 1.6, "BBB": 1.8, "BBB-": 2.0,
-                "BB+": 2.5, "BB": 3.0, "BB-": 3.5,
-                "B+": 4.0, "B": 5.0, "B-": 6.0,
-                "CCC": 8.0, "CC": 10.0, "C": 12.0, "D": 15.0
-            }
-            adjustment = rating_adjustments.get(investment.credit_rating.value, 2.0)
-            base_weight *= adjustment
+        if credit_rating:
+            base_weight *= _RATING_ADJ.get(credit_rating, 2.0)
         
         return base_weight
     
     def _get_fx_risk_weight(self, exposure: FXExposure) -> float:
         """Get risk weight for FX exposure"""
+        return self._fx_risk_weight(
+            exposure.base_currency, exposure.exposure_currency, float(exposure.hedge_ratio)
+        )
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _fx_risk_weight(base_currency: str, exposure_currency: str, hedge_ratio: float) -> float:
+        """Risk weight for a currency pair at a given hedge ratio"""
         # Base FX volatility by currency pair
-        volatilities = {
-            ("USD", "EUR"): 0.12,
-            ("USD", "GBP"): 0.14,
-            ("USD", "JPY"): 0.16,
-            ("USD", "CAD"): 0.10,
-            ("USD", "AUD"): 0.18,
-            ("USD", "CHF"): 0.11,
-            ("USD", "SGD"): 0.08
-        }
-        
-        pair = (exposure.base_currency, exposure.exposure_currency)
-        base_vol = volatilities.get(pair, 0.15)
+        base_vol = _FX_ANNUAL_VOL.get((base_currency, exposure_currency), _DEFAULT_FX_ANNUAL_VOL)
         
         # Adjust for hedge ratio (lower risk if hedged)
-        hedge_adjustment = 1.0 - float(exposure.hedge_ratio) * 0.8
+        hedge_adjustment = 1.0 - hedge_ratio * 0.8
         
         return base_vol * hedge_adjustment
     
+    def _parametric_var(
+        self,
+        portfolio_components: PortfolioArrays,
+        confidence_level: float,
+        time_horizon: int
+    ) -> Dict[str, float]:
+        """Closed-form VaR for the correlated normal shock model the simulation samples from"""
+        portfolio_values = portfolio_components.values
+        risk_weights = portfolio_components.risk_weights
+        
+        if len(portfolio_values) == 0:
+            return {
+                "var_1d": 0.0,
+                "var_10d": 0.0,
+                "expected_shortfall": 0.0
+            }
+        
+        correlation_matrix = self._build_correlation_matrix(len(portfolio_values))
+        
+        # Portfolio return is normal with variance w^T C w
+        asset_weights = risk_weights * portfolio_values / portfolio_values.sum()
+        sigma_p = float(np.sqrt(asset_weights @ correlation_matrix @ asset_weights)) * np.sqrt(time_horizon)
+        
+        z_score = norm.ppf(confidence_level)
+        var_1d = z_score * sigma_p
+        var_10d = var_1d * np.sqrt(10)  # Scale to 10 days
+        expected_shortfall = sigma_p * norm.pdf(z_score) / (1 - confidence_level)
+        
+        total_value = portfolio_components.total
+        return {
+            "var_1d": var_1d * total_value,
+            "var_10d": var_10d * total_value,
+            "expected_shortfall": expected_shortfall * total_value
+        }
+    
     def _monte_carlo_var_simulation(
         self,
-        portfolio_components: Dict[str, Any],
+        portfolio_components: PortfolioArrays,
         market_data: Dict[str, Any],
         confidence_level: float,
         time_horizon: int,
@@ -234,20 +386,8 @@ class RiskCalculationService:
     ) -> Dict[str, float]:
         """Run Monte Carlo simulation for VaR calculation"""
         
-        # Initialize random number generator
-        np.random.seed(42)  # For reproducible results
-        
-        # Extract portfolio values
-        portfolio_values = []
-        risk_weights = []
-        
-        for component_type in ["cash", "investments", "fx"]:
-            for component in portfolio_components[component_type]:
-                portfolio_values.append(float(component["value"]))
-                risk_weights.append(component["risk_weight"])
-        
-        portfolio_values = np.array(portfolio_values)
-        risk_weights = np.array(risk_weights)
+        portfolio_values = portfolio_components.values
+        risk_weights = portfolio_components.risk_weights
         
         if len(portfolio_values) == 0:
             return {
@@ -257,135 +397,135 @@ class RiskCalculationService:
             }
         
         # Generate correlated random shocks
-        correlation_matrix = self._build_correlation_matrix(len(portfolio_values))
-        
-        # Run simulations
-        portfolio_returns = []
-        
-        for _ in range(num_simulations):
-            # Generate correlated random shocks
-            random_shocks = np.random.multivariate_normal(
-                mean=np.zeros(len(portfolio_values)),
-                cov=correlation_matrix
-            )
-            
-            # Apply risk weights and time scaling
-            scaled_shocks = random_shocks * risk_weights * np.sqrt(time_horizon)
-            
-            # Calculate portfolio return
-            portfolio_return = np.sum(portfolio_values * scaled_shocks) / np.sum(portfolio_values)
-            portfolio_returns.append(portfolio_return)
-        
-        portfolio_returns = np.array(portfolio_returns)
-        
-        # Calculate VaR and Expected Shortfall
-        var_percentile = (1 - confidence_level) * 100
-        var_1d = -np.percentile(portfolio_returns, var_percentile)
+        n_assets = len(portfolio_values)
+        correlation_matrix = self._build_correlation_matrix(n_assets)
+        
+        # Correlate independent standard normals through the Cholesky factor, as
+        # multivariate_normal(method="cholesky") would. The matrix is already PD (eigenvalues
+        # floored at 0.01), so it is factored in float64 as-is and then narrowed: the
+        # simulation runs in float32, half the memory traffic, ample precision for a quantile
+        cholesky_factor = self._get_risk_matrix(("cholesky", n_assets))
+        if cholesky_factor is None:
+            cholesky_factor = np.linalg.cholesky(correlation_matrix).astype(np.float32)
+            self._put_risk_matrix(("cholesky", n_assets), cholesky_factor)
+        # Per-call generator: no process-wide RNG state shared between concurrent VaR calls
+        rng = np.random.default_rng(self._simulation_seed)
+        standard_normals = rng.standard_normal((num_simulations, n_assets), dtype=np.float32)
+        
+        # Risk weights, time scaling and value weights combine into one exposure per asset, so
+        # return_i = sum_k w_k (Z_i L^T)_k = Z_i (L^T w): one matrix-vector pass over the draws
+        # with no (num_simulations, n_assets) shock temporaries
+        asset_weights = risk_weights * np.sqrt(time_horizon) * portfolio_values / portfolio_values.sum()
+        factor_loadings = cholesky_factor.T @ asset_weights.astype(np.float32)
+        portfolio_returns = standard_normals @ factor_loadings
+        
+        # Calculate VaR as the k-th worst return; partitioning also isolates the tail
+        tail_size = int(num_simulations * (1 - confidence_level))
+        partitioned = np.partition(portfolio_returns, tail_size)
+        var_1d = -float(partitioned[tail_size])
         var_10d = var_1d * np.sqrt(10)  # Scale to 10 days
         
         # Expected Shortfall (average of losses beyond VaR)
-        tail_losses = portfolio_returns[portfolio_returns <= -var_1d]
-        expected_shortfall = -np.mean(tail_losses) if len(tail_losses) > 0 else var_1d
+        expected_shortfall = -float(partitioned[:tail_size].mean()) if tail_size > 0 else var_1d
         
         return {
-            "var_1d": var_1d * float(portfolio_components["total_value"]),
-            "var_10d": var_10d * float(portfolio_components["total_value"]),
-            "expected_shortfall": expected_shortfall * float(portfolio_components["total_value"])
+            "var_1d": var_1d * portfolio_components.total,
+            "var_10d": var_10d * portfolio_components.total,
+            "expected_shortfall": expected_shortfall * portfolio_components.total
         }
     
     def _build_correlation_matrix(self, n_assets: int) -> np.ndarray:
-        """Build correlation matrix for portfolio components"""
-        # Start with identity matrix
-        correlation_matrix = np.eye(n_assets)
+        """Build correlation matrix for portfolio components (cached per size)"""
+        cached = self._get_risk_matrix(("correlation", n_assets))
+        if cached is not None:
+            return cached
         
-        # Add some realistic correlations
-        base_correlation = 0.3
+        rng = np.random.default_rng(42)  # For reproducible results
         
-        for i in range(n_assets):
-            for j in range(i+1, n_assets):
-                # Random correlation with some structure
-                correlation = base_correlation * np.random.uniform(0.5, 1.0)
-                correlation_matrix[i, j] = correlation
-                correlation_matrix[j, i] = correlation
+        # Add some realistic correlations above the diagonal and mirror them
+        base_correlation = 0.3
+        upper = np.triu(rng.uniform(0.5, 1.0, size=(n_assets, n_assets)) * base_correlation, k=1)
+        correlation_matrix = upper + upper.T + np.eye(n_assets)
         
         # Ensure positive definite
         eigenvals, eigenvecs = np.linalg.eigh(correlation_matrix)
         eigenvals = np.maximum(eigenvals, 0.01)  # Ensure positive eigenvalues
-        correlation_matrix = eigenvecs @ np.diag(eigenvals) @ eigenvecs.T
+        correlation_matrix = (eigenvecs * eigenvals) @ eigenvecs.T
         
+        self._put_risk_matrix(("correlation", n_assets), correlation_matrix)
         return correlation_matrix
     
+    def _get_risk_matrix(self, key: Tuple[str, int]) -> Optional[np.ndarray]:
+        """Look up a cached shape-dependent matrix, marking it recently used"""
+        cached = self._risk_cache.get(key)
+        if cached is not None:
+            self._risk_cache.move_to_end(key)
+        return cached
+    
+    def _put_risk_matrix(self, key: Tuple[str, int], matrix: np.ndarray) -> None:
+        """Cache a shape-dependent matrix read-only, evicting the least recently used"""
+        matrix.setflags(write=False)
+        self._risk_cache[key] = matrix
+        if len(self._risk_cache) > self.RISK_CACHE_SIZE:
+            self._risk_cache.popitem(last=False)
+    
     def _calculate_component_vars(
         self,
-        portfolio_components: Dict[str, Any],
+        portfolio_components: PortfolioArrays,
         var_results: Dict[str, float]
     ) -> Dict[str, Decimal]:
         """Calculate VaR contribution by component"""
         component_vars = {}
         
-        total_value = float(portfolio_components["total_value"])
+        total_value = portfolio_components.total
         if total_value == 0:
             return component_vars
         
-        # Simplified component VaR calculation
-        for component_type in ["cash", "investments", "fx"]:
-            type_value = sum(
-                float(comp["value"]) for comp in portfolio_components[component_type]
-            )
-            type_weight = type_value / total_value if total_value > 0 else 0
+        # Simplified component VaR calculation: value share of each component type
+        type_values = np.bincount(
+            portfolio_components.kinds,
+            weights=portfolio_components.values,
+            minlength=len(COMPONENT_TYPES)
+        )
+        for kind, component_type in enumerate(COMPONENT_TYPES):
+            type_weight = type_values[kind] / total_value if total_value > 0 else 0
             
-            component_vars[f"{component_type}_var"] = Decimal(str(
+            component_vars[f"{component_type}_var"] = _to_cents(
                 var_results["var_1d"] * type_weight
-            ))
+            )
         
         return component_vars
     
     def _run_stress_tests(
         self,
-        portfolio_components: Dict[str, Any],
+        portfolio_components: PortfolioArrays,
         market_data: Dict[str, Any]
     ) -> Dict[str, Decimal]:
         """Run stress test scenarios"""
         stress_results = {}
         
-        total_value = float(portfolio_components["total_value"])
+        total_value = portfolio_components.total
         if total_value == 0:
             return stress_results
         
-        # Define stress scenarios
-        scenarios = {
-            "interest_rate_shock_up": {"rate_change": 0.02, "fx_impact": 0.05},
-            "interest_rate_shock_down": {"rate_change": -0.02, "fx_impact": -0.03},
-            "fx_crisis": {"rate_change": 0.01, "fx_impact": 0.20},
-            "credit_crisis": {"rate_change": 0.03, "fx_impact": 0.10},
-            "liquidity_crisis": {"rate_change": 0.05, "fx_impact": 0.15}
-        }
-        
-        for scenario_name, scenario in scenarios.items():
-            scenario_loss = 0.0
-            
-            # Impact on cash positions
-            for cash_comp in portfolio_components["cash"]:
-                # Interest rate impact on cash is minimal
-                loss = float(cash_comp["value"]) * scenario["rate_change"] * 0.1
-                scenario_loss += loss
-            
-            # Impact on investments
-            for inv_comp in portfolio_components["investments"]:
-                # Duration-based interest rate impact
-                duration = 2.0  # Simplified average duration
-                rate_impact = float(inv_comp["value"]) * duration * scenario["rate_change"]
-                scenario_loss += abs(rate_impact)
-            
-            # Impact on FX exposures
-            for fx_comp in portfolio_components["fx"]:
-                fx_impact = float(fx_comp["notional"]) * scenario["fx_impact"]
-                # Adjust for hedge ratio
-                hedge_ratio = float(fx_comp["hedge_ratio"])
-                unhedged_impact = fx_impact * (1 - hedge_ratio)
-                scenario_loss += abs(unhedged_impact)
-            
-            stress_results[scenario_name] = Decimal(str(scenario_loss))
+        kinds = portfolio_components.kinds
+        values = portfolio_components.values
+        cash_value = values[kinds == CASH].sum()
+        investment_value = values[kinds == INVESTMENTS].sum()
+        fx_mask = kinds == FX
+        fx_unhedged = (values[fx_mask] * (1 - portfolio_components.hedge_ratios[fx_mask])).sum()
+        
+        # All scenarios at once: rate impact on cash is minimal, investments take a
+        # duration-based rate impact, FX exposures move on their unhedged notional
+        duration = 2.0  # Simplified average duration
+        scenario_losses = (
+            STRESS_RATE_CHANGES * (cash_value * 0.1)
+            + np.abs(STRESS_RATE_CHANGES) * (investment_value * duration)
+            + np.abs(STRESS_FX_IMPACTS) * fx_unhedged
+        )
+        
+        for scenario_name, scenario_loss in zip(STRESS_SCENARIOS, scenario_losses.tolist()):
+            stress_results[scenario_name] = _to_cents(scenario_loss)
         
         return stress_results
     
@@ -409,14 +549,15 @@ class RiskCalculationService:
                     hedging_recommendations=[]
                 )
             
-            # Calculate exposure totals
-            total_exposure = sum(fx.notional_amount for fx in fx_exposures)
-            hedged_exposure = sum(
-                fx.notional_amount * fx.hedge_ratio for fx in fx_exposures
+            # Calculate exposure totals on floats; fsum keeps them correctly rounded
+            notionals = [float(fx.notional_amount) for fx in fx_exposures]
+            total_exposure = math.fsum(notionals)
+            hedged_exposure = math.fsum(
+                notional * float(fx.hedge_ratio) for notional, fx in zip(notionals, fx_exposures)
             )
             unhedged_exposure = total_exposure - hedged_exposure
             
-            overall_hedge_ratio = float(hedged_exposure / total_exposure) if total_exposure > 0 else 0.0
+            overall_hedge_ratio = hedged_exposure / total_exposure if total_exposure > 0 else 0.0
             
             # Calculate currency-specific VaRs
             currency_vars = await self._calculate_currency_vars(fx_exposures)
@@ -430,9 +571,9 @@ class RiskCalculationService:
             )
             
             return CurrencyRiskAnalysis(
-                total_exposure=total_exposure,
-                hedged_exposure=hedged_exposure,
-                unhedged_exposure=unhedged_exposure,
+                total_exposure=_to_cents(total_exposure),
+                hedged_exposure=_to_cents(hedged_exposure),
+                unhedged_exposure=_to_cents(unhedged_exposure),
                 hedge_ratio=overall_hedge_ratio,
                 currency_vars=currency_vars,
                 correlation_matrix=correlation_matrix,
@@ -453,80 +594,53 @@ class RiskCalculationService:
         # Get current exchange rates for volatility calculation
         exchange_rates = await self.market_data.get_exchange_rates()
         
-        for fx in fx_exposures:
-            currency_pair = f"{fx.base_currency}/{fx.exposure_currency}"
-            
-            # Get historical volatility (simplified)
-            volatility = self._get_fx_volatility(fx.base_currency, fx.exposure_currency)
-            
-            # Calculate 1-day VaR at 95% confidence
-            var_1d = float(fx.notional_amount) * volatility * 1.645  # 95% confidence
-            
-            # Adjust for hedge ratio
-            unhedged_var = var_1d * (1 - float(fx.hedge_ratio))
-            
-            currency_vars[currency_pair] = Decimal(str(unhedged_var))
+        notionals = np.array([float(fx.notional_amount) for fx in fx_exposures])
+        hedge_ratios = np.array([float(fx.hedge_ratio) for fx in fx_exposures])
+        
+        # Get historical volatility (simplified)
+        daily_vols = np.array([
+            self._get_fx_volatility(fx.base_currency, fx.exposure_currency) for fx in fx_exposures
+        ])
+        
+        # 1-day VaR at 95% confidence, adjusted for hedge ratio
+        unhedged_vars = notionals * daily_vols * 1.645 * (1 - hedge_ratios)
+        
+        for fx, unhedged_var in zip(fx_exposures, unhedged_vars.tolist()):
+            currency_vars[f"{fx.base_currency}/{fx.exposure_currency}"] = _to_cents(unhedged_var)
         
         return currency_vars
     
     def _get_fx_volatility(self, base_currency: str, target_currency: str) -> float:
         """Get FX volatility for currency pair"""
-        # Historical volatilities (annualized)
-        volatilities = {
-            ("USD", "EUR"): 0.12,
-            ("USD", "GBP"): 0.14,
-            ("USD", "JPY"): 0.16,
-            ("USD", "CAD"): 0.10,
-            ("USD", "AUD"): 0.18,
-            ("USD", "CHF"): 0.11,
-            ("USD", "SGD"): 0.08
-        }
-        
-        pair = (base_currency, target_currency)
-        annual_vol = volatilities.get(pair, 0.15)
-        
-        # Convert to daily volatility
-        daily_vol = annual_vol / np.sqrt(252)  # 252 trading days per year
-        
-        return daily_vol
+        return _FX_DAILY_VOL.get((base_currency, target_currency), _DEFAULT_FX_DAILY_VOL)
     
     def _build_fx_correlation_matrix(
         self,
         fx_exposures: List[FXExposure]
     ) -> Dict[str, Dict[str, float]]:
         """Build FX correlation matrix"""
-        currencies = list(set(
+        currencies = sorted(set(
             fx.exposure_currency for fx in fx_exposures
         ))
+        index = {currency: i for i, currency in enumerate(currencies)}
+        
+        # Simplified correlation matrix: default off-diagonal, known pairs filled symmetrically
+        matrix = np.full((len(currencies), len(currencies)), _DEFAULT_CURRENCY_CORRELATION)
+        for (curr1, curr2), correlation in _CURRENCY_CORRELATIONS.items():
+            i, j = index.get(curr1), index.get(curr2)
+            if i is not None and j is not None:
+                matrix[i, j] = matrix[j, i] = correlation
+        np.fill_diagonal(matrix, 1.0)
         
-        # Simplified correlation matrix
-        correlations = {}
-        for curr1 in currencies:
-            correlations[curr1] = {}
-            for curr2 in currencies:
-                if curr1 == curr2:
-                    correlations[curr1][curr2] = 1.0
-                else:
-                    # Simplified correlation based on economic relationships
-                    correlation = self._get_currency_correlation(curr1, curr2)
-                    correlations[curr1][curr2] = correlation
-        
-        return correlations
+        return {
+            currency: dict(zip(currencies, row))
+            for currency, row in zip(currencies, matrix.tolist())
+        }
     
     def _get_currency_correlation(self, curr1: str, curr2: str) -> float:
         """Get correlation between two currencies"""
-        # Simplified correlation matrix
-        correlations = {
-            ("EUR", "GBP"): 0.7,
-            ("EUR", "CHF"): 0.8,
-            ("GBP", "CHF"): 0.6,
-            ("JPY", "CHF"): 0.3,
-            ("CAD", "AUD"): 0.6,
-            ("SGD", "JPY"): 0.4,
-        }
-        
-        pair = tuple(sorted([curr1, curr2]))
-        return correlations.get(pair, 0.3)  # Default correlation
+        pair = (curr1, curr2) if curr1 < curr2 else (curr2, curr1)
+        return _CURRENCY_CORRELATIONS.get(pair, _DEFAULT_CURRENCY_CORRELATION)
     
     def _generate_hedging_recommendations(
         self,
@@ -536,31 +650,31 @@ class RiskCalculationService:
         """Generate FX hedging recommendations"""
         recommendations = []
         
-        for fx in fx_exposures:
-            currency_pair = f"{fx.base_currency}/{fx.exposure_currency}"
-            current_hedge_ratio = float(fx.hedge_ratio)
-            
-            # Get VaR for this exposure
-            exposure_var = currency_vars.get(currency_pair, Decimal("0"))
-            
-            # Recommend hedging if unhedged VaR is significant
-            if exposure_var > fx.notional_amount * Decimal("0.05"):  # 5% threshold
-                if current_hedge_ratio < 0.8:  # Less than 80% hedged
-                    recommendations.append({
-                        "exposure_id": fx.id,
-                        "currency_pair": currency_pair,
-                        "current_hedge_ratio": current_hedge_ratio,
-                        "recommended_hedge_ratio": 0.85,
-                        "additional_hedge_amount": float(
-                            fx.notional_amount * (Decimal("0.85") - fx.hedge_ratio)
-                        ),
-                        "expected_var_reduction": float(exposure_var * Decimal("0.85")),
-                        "recommended_instruments": [
-                            "Forward contracts",
-                            "Currency options",
-                            "Cross-currency swaps"
-                        ],
-                        "priority": "high" if exposure_var > fx.notional_amount * Decimal("0.10") else "medium"
-                    })
+        currency_pairs = [f"{fx.base_currency}/{fx.exposure_currency}" for fx in fx_exposures]
+        notionals = np.array([float(fx.notional_amount) for fx in fx_exposures])
+        hedge_ratios = np.array([float(fx.hedge_ratio) for fx in fx_exposures])
+        
+        # Get VaR for each exposure
+        exposure_vars = np.array([float(currency_vars.get(pair, 0)) for pair in currency_pairs])
+        
+        # Recommend hedging if unhedged VaR is significant (5% threshold) and less than 80% hedged
+        needs_hedge = (exposure_vars > notionals * 0.05) & (hedge_ratios < 0.8)
+        high_priority = exposure_vars > notionals * 0.10
+        
+        for i in np.flatnonzero(needs_hedge).tolist():
+            recommendations.append({
+                "exposure_id": fx_exposures[i].id,
+                "currency_pair": currency_pairs[i],
+                "current_hedge_ratio": float(hedge_ratios[i]),
+                "recommended_hedge_ratio": 0.85,
+                "additional_hedge_amount": float(notionals[i] * (0.85 - hedge_ratios[i])),
+                "expected_var_reduction": float(exposure_vars[i] * 0.85),
+                "recommended_instruments": [
+                    "Forward contracts",
+                    "Currency options",
+                    "Cross-currency swaps"
+                ],
+                "priority": "high" if high_priority[i] else "medium"
+            })
         
         return recommendations
\ No newline at end of file
@@ -10,15 +10,32 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Dict, Any
 
+import orjson
+
 # Mock the external dependencies for demo purposes
 class MockHttpxClient:
+    # One shared instance, mirroring the pipeline's pooled client
+    _instance = None
+    
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None or cls._instance.is_closed:
+            cls._instance = super().__new__(cls)
+            cls._instance.is_closed = False
+        return cls._instance
+    
+    def __init__(self, *args, **kwargs):
+        pass
+    
     async def __aenter__(self):
         return self
     
     async def __aexit__(self, *args):
         pass
     
-    async def get(self, url, params=None):
+    async def aclose(self):
+        self.is_closed = True
+    
+    async def get(self, url, params=None, headers=None):
         # Mock response for FRED API
         if "stlouisfed.org" in url:
             return MockResponse({
@@ -43,11 +60,13 @@ class MockHttpxClient:
 
 class MockResponse:
     def __init__(self, data):
-        self._data = data
+        # Serialized like a real body so the pipeline's orjson decoding path is exercised
+        self.content = orjson.dumps(data)
         self.status_code = 200
+        self.headers = {}
     
     def json(self):
-        return self._data
+        return orjson.loads(self.content)
     
     def raise_for_status(self):
         pass
@@ -62,14 +81,6 @@ sys.modules['httpx'].AsyncClient = MockHttpxClient
 sys.modules['structlog'] = MagicMock()
 sys.modules['structlog'].get_logger.return_value = MagicMock()
 
-# Mock numpy for data quality service
-sys.modules['numpy'] = MagicMock()
-import numpy as np
-np.mean = lambda x: sum(x) / len(x)
-np.std = lambda x: (sum((i - np.mean(x))**2 for i in x) / len(x))**0.5
-np.diff = lambda x: [x[i+1] - x[i] for i in range(len(x)-1)]
-np.log = lambda x: [__import__('math').log(i) if hasattr(x, '__iter__') else __import__('math').log(x) for i in x] if hasattr(x, '__iter__') else __import__('math').log(x)
-
 # Mock settings
 class MockSettings:
     FEDERAL_RESERVE_API_KEY = None
@@ -167,24 +178,26 @@ async def demo_market_data_ingestion():
     
     pipeline = MarketDataIngestionPipeline()
     
-    # Test Federal Reserve rates (demo mode)
-    print("Fetching Federal Reserve rates...")
-    rates = await pipeline.get_federal_reserve_rates()
+    # Fetch rates, exchange rates and the yield curve concurrently (demo mode)
+    print("Fetching Federal Reserve rates, exchange rates and Treasury yield curve...")
+    rates, fx_rates, yield_curve = await asyncio.gather(
+        pipeline.get_federal_reserve_rates(),
+        pipeline.get_exchange_rates(),
+        pipeline.get_treasury_yield_curve()
+    )
+    
+    # Test Federal Reserve rates
     print(f"Retrieved {len(rates)} interest rates:")
     for name, rate in list(rates.items())[:3]:  # Show first 3
         print(f"  {name}: {rate.rate}% (source: {rate.source})")
     
-    # Test exchange rates (demo mode)
-    print("\nFetching exchange rates...")
-    fx_rates = await pipeline.get_exchange_rates()
-    print(f"Retrieved {len(fx_rates)} exchange rates:")
+    # Test exchange rates
+    print(f"\nRetrieved {len(fx_rates)} exchange rates:")
     for currency, rate in list(fx_rates.items())[:3]:  # Show first 3
         print(f"  USD/{currency}: {rate.rate} (source: {rate.source})")
     
     # Test yield curve
-    print("\nFetching Treasury yield curve...")
-    yield_curve = await pipeline.get_treasury_yield_curve()
-    print(f"Retrieved {len(yield_curve)} yield points:")
+    print(f"\nRetrieved {len(yield_curve)} yield points:")
     for yc in yield_curve[:4]:  # Show first 4
         print(f"  {yc.maturity}: {yc.yield_rate}%")
     
@@ -194,16 +207,17 @@ async def demo_market_data_ingestion():
     print(f"Market summary generated at: {summary['timestamp']}")
     print(f"Yield curve slope (10Y-2Y): {summary['market_indicators']['yield_curve_slope']:.2f}%")
     print(f"Risk sentiment: {summary['market_indicators']['risk_sentiment']}")
+    
+    await pipeline.aclose()
 
 
 async def demo_full_ingestion_pipeline():
     """Demonstrate the complete ingestion pipeline with quality validation"""
     print("\n=== Full Ingestion Pipeline Demo ===")
     
-    pipeline = MarketDataIngestionPipeline()
-    
     print("Running complete data ingestion pipeline...")
-    result = await pipeline.ingest_market_data()
+    async with MarketDataIngestionPipeline() as pipeline:
+        result = await pipeline.ingest_market_data()
     
     print(f"Ingestion Result:")
     print(f"  Success: {result.success}")
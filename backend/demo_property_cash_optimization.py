@@ -16,8 +16,12 @@ all required correctness properties across diverse input scenarios.
 """
 
 import asyncio
+import functools
+import io
 import sys
 import os
+from contextvars import ContextVar
+from dataclasses import dataclass
 from pathlib import Path
 from decimal import Decimal
 from datetime import datetime, timedelta
@@ -118,6 +122,73 @@ def create_demo_cash_positions() -> list[CashPosition]:
     ]
 
 
+@functools.lru_cache(maxsize=1)
+def _demo_positions() -> tuple[CashPosition, ...]:
+    """Demo positions, built once and shared by every property demo"""
+    return tuple(create_demo_cash_positions())
+
+
+@dataclass
+class DemoContext:
+    """Services shared by the property demos, created on first use"""
+    
+    @functools.cached_property
+    def market_data_service(self) -> MarketDataIngestionPipeline:
+        return MarketDataIngestionPipeline()
+    
+    @functools.cached_property
+    def analytics_engine(self) -> TreasuryAnalyticsEngine:
+        return TreasuryAnalyticsEngine(self.market_data_service)
+    
+    async def aclose(self) -> None:
+        """Close the pipeline's HTTP client if it was ever created"""
+        if "market_data_service" in self.__dict__:
+            await self.market_data_service.aclose()
+
+
+_context = DemoContext()
+
+# Per-task output buffer used while the property demos run concurrently
+_demo_output: ContextVar[io.StringIO | None] = ContextVar("_demo_output", default=None)
+
+
+class _TaskLocalStdout(io.TextIOBase):
+    """stdout proxy that sends writes to the current task's buffer, if any"""
+    
+    def __init__(self, stream):
+        self._stream = stream
+    
+    def write(self, text: str) -> int:
+        return (_demo_output.get() or self._stream).write(text)
+    
+    def flush(self) -> None:
+        self._stream.flush()
+
+
+async def _gather_in_order(*demos):
+    """
+    Run the demos concurrently, printing each one's output in argument order
+    
+    Every demo runs in its own task, so the buffer it sets is only seen by
+    its own prints.
+    """
+    buffers = [io.StringIO() for _ in demos]
+    
+    async def run(demo, buffer):
+        _demo_output.set(buffer)
+        return await demo
+    
+    stdout = sys.stdout
+    sys.stdout = _TaskLocalStdout(stdout)
+    try:
+        return await asyncio.gather(*(run(demo, buffer) for demo, buffer in zip(demos, buffers)))
+    finally:
+        sys.stdout = stdout
+        for buffer in buffers:
+            stdout.write(buffer.getvalue())
+        stdout.flush()
+
+
 async def demo_property_1_cash_optimization_detection():
     """
     Demonstrate Property 1: Cash Optimization Detection
@@ -130,11 +201,10 @@ async def demo_property_1_cash_optimization_detection():
     print("="*80)
     
     # Initialize analytics engine
-    market_data_service = MarketDataIngestionPipeline()
-    analytics_engine = TreasuryAnalyticsEngine(market_data_service)
+    analytics_engine = _context.analytics_engine
     
     # Get demo positions
-    cash_positions = create_demo_cash_positions()
+    cash_positions = list(_demo_positions())
     
     print(f"\nAnalyzing {len(cash_positions)} cash positions:")
     total_balance = sum(pos.balance for pos in cash_positions)
@@ -182,10 +252,9 @@ async def demo_property_2_market_driven_recalculation():
     print("="*80)
     
     # Initialize analytics engine
-    market_data_service = MarketDataIngestionPipeline()
-    analytics_engine = TreasuryAnalyticsEngine(market_data_service)
+    analytics_engine = _context.analytics_engine
     
-    cash_positions = create_demo_cash_positions()
+    cash_positions = list(_demo_positions())
     
     # Initial optimization
     print("\n📈 INITIAL MARKET CONDITIONS:")
@@ -235,27 +304,20 @@ async def demo_property_3_liquidity_shortfall_response():
     print("="*80)
     
     # Initialize analytics engine
-    market_data_service = MarketDataIngestionPipeline()
-    analytics_engine = TreasuryAnalyticsEngine(market_data_service)
+    analytics_engine = _context.analytics_engine
     
-    cash_positions = create_demo_cash_positions()
+    cash_positions = list(_demo_positions())
     
-    # Calculate liquidity metrics
-    total_balance = sum(pos.balance for pos in cash_positions)
-    immediate_liquidity = sum(
-        pos.balance for pos in cash_positions 
-        if pos.liquidity_tier == LiquidityTier.IMMEDIATE
-    )
+    # Run liquidity analysis; it reports the balance totals used below
+    liquidity_analysis = await analytics_engine.analyze_liquidity_requirements(cash_positions)
+    total_balance = liquidity_analysis.total_cash
+    immediate_liquidity = liquidity_analysis.immediate_liquidity
     
     print(f"\n💰 LIQUIDITY ANALYSIS:")
     print(f"Total Cash Balance: ${total_balance:,.2f}")
     print(f"Immediate Liquidity: ${immediate_liquidity:,.2f}")
     print(f"Immediate Liquidity Ratio: {float(immediate_liquidity / total_balance):.1%}")
     
-    # Run liquidity analysis
-    print("\n🔍 Running comprehensive liquidity analysis...")
-    liquidity_analysis = await analytics_engine.analyze_liquidity_requirements(cash_positions)
-    
     print(f"\n📊 LIQUIDITY ASSESSMENT:")
     print(f"Current Liquidity Ratio: {liquidity_analysis.current_liquidity_ratio:.1%}")
     print(f"Liquidity Gap: ${liquidity_analysis.liquidity_gap:,.2f}")
@@ -300,10 +362,9 @@ async def demo_property_4_comprehensive_optimization_recommendations():
     print("="*80)
     
     # Initialize analytics engine
-    market_data_service = MarketDataIngestionPipeline()
-    analytics_engine = TreasuryAnalyticsEngine(market_data_service)
+    analytics_engine = _context.analytics_engine
     
-    cash_positions = create_demo_cash_positions()
+    cash_positions = list(_demo_positions())
     entity_id = "globaltech_us"
     
     print(f"\n🎯 Generating comprehensive recommendations for {entity_id}...")
@@ -397,7 +458,7 @@ async def demo_property_4_comprehensive_optimization_recommendations():
 
 
 async def run_all_property_demonstrations():
-    """Run all property demonstrations in sequence"""
+    """Run all property demonstrations concurrently"""
     print("🚀 STARTING CASH OPTIMIZATION PROPERTY DEMONSTRATIONS")
     print("=" * 80)
     print("This demo validates the four core properties of the cash optimization system:")
@@ -408,11 +469,13 @@ async def run_all_property_demonstrations():
     print("=" * 80)
     
     try:
-        # Run all property demonstrations
-        optimization_result = await demo_property_1_cash_optimization_detection()
-        await demo_property_2_market_driven_recalculation()
-        liquidity_analysis = await demo_property_3_liquidity_shortfall_response()
-        comprehensive_recs = await demo_property_4_comprehensive_optimization_recommendations()
+        # Run all property demonstrations; they only read the shared inputs
+        optimization_result, _, liquidity_analysis, comprehensive_recs = await _gather_in_order(
+            demo_property_1_cash_optimization_detection(),
+            demo_property_2_market_driven_recalculation(),
+            demo_property_3_liquidity_shortfall_response(),
+            demo_property_4_comprehensive_optimization_recommendations()
+        )
         
         # Final summary
         print("\n" + "="*80)
@@ -435,6 +498,9 @@ async def run_all_property_demonstrations():
         logger.error("Property demonstration failed", error=str(e))
         print(f"\n❌ PROPERTY DEMONSTRATION FAILED: {e}")
         return False
+    
+    finally:
+        await _context.aclose()
 
 
 if __name__ == "__main__":
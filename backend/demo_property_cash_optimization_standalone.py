@@ -8,6 +8,9 @@ without requiring the full service infrastructure.
 """
 
 import asyncio
+import contextlib
+import functools
+import io
 import sys
 from decimal import Decimal
 from datetime import datetime, timedelta
@@ -344,6 +347,21 @@ def create_demo_cash_positions() -> List[CashPosition]:
     ]
 
 
+def _buffered_output(demo):
+    """Collect a demo's output and write it to stdout in a single call"""
+    @functools.wraps(demo)
+    async def wrapper(*args, **kwargs):
+        buffer = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(buffer):
+                return await demo(*args, **kwargs)
+        finally:
+            sys.stdout.write(buffer.getvalue())
+            sys.stdout.flush()
+    return wrapper
+
+
+@_buffered_output
 async def demo_property_1_cash_optimization_detection():
     """Demonstrate Property 1: Cash Optimization Detection"""
     print("\n" + "="*80)
@@ -387,6 +405,7 @@ async def demo_property_1_cash_optimization_detection():
     return optimization_result
 
 
+@_buffered_output
 async def demo_property_3_liquidity_shortfall_response():
     """Demonstrate Property 3: Liquidity Shortfall Response"""
     print("\n" + "="*80)
@@ -435,6 +454,7 @@ async def demo_property_3_liquidity_shortfall_response():
     return liquidity_analysis
 
 
+@_buffered_output
 async def demo_property_5_opportunity_detection():
     """Demonstrate Property 5: Alert Threshold Enforcement"""
     print("\n" + "="*80)
@@ -4,7 +4,7 @@ Risk Calculation Engine Demo
 Feature: treasuryiq-corporate-ai
 
 This script demonstrates the comprehensive risk calculation capabilities including:
-- Value at Risk (VaR) calculations using Monte Carlo simulation
+- Value at Risk (VaR) calculations, parametric by default with optional Monte Carlo simulation
 - Currency risk assessment and hedging recommendations
 - Credit risk scoring and analysis
 - Stress testing and scenario analysis
@@ -615,7 +615,7 @@ async def run_comprehensive_risk_demo():
     print("🚀 STARTING COMPREHENSIVE RISK CALCULATION ENGINE DEMONSTRATION")
     print("=" * 80)
     print("This demo showcases the complete risk management capabilities:")
-    print("1. Value at Risk (VaR) Calculation using Monte Carlo simulation")
+    print("1. Value at Risk (VaR) Calculation using the parametric method")
     print("2. Currency Risk Assessment with hedging recommendations")
     print("3. Comprehensive Stress Testing across multiple scenarios")
     print("4. Risk Monitoring & Alert System with threshold management")
@@ -650,7 +650,7 @@ async def run_comprehensive_risk_demo():
         print(f"Worst-Case Stress Loss: ${worst_case_loss:,.2f}")
         
         print(f"\n🏆 The risk calculation engine successfully demonstrates:")
-        print(f"• Advanced Monte Carlo VaR modeling with component attribution")
+        print(f"• Parametric and Monte Carlo VaR modeling with component attribution")
         print(f"• Multi-currency risk assessment with correlation analysis")
         print(f"• Comprehensive stress testing across 5 economic scenarios")
         print(f"• Real-time risk monitoring with automated alert generation")
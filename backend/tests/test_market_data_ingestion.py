@@ -2,12 +2,14 @@
 Tests for market data ingestion pipeline
 """
 
+import asyncio
+import time
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
 from decimal import Decimal
 
-from app.services.market_data import MarketDataIngestionPipeline, DataIngestionResult
+from app.services.market_data import MarketDataIngestionPipeline, DataIngestionResult, CircuitOpen
 from app.services.data_quality import DataQualityReport, DataQualityIssue, DataQualitySeverity, DataQualityIssueType
 
 
@@ -74,6 +76,20 @@ async def test_data_quality_validation_success(market_data_service, sample_marke
     assert isinstance(quality_report.passed_validation, bool)
 
 
+@pytest.mark.asyncio
+async def test_validate_and_score_matches_two_step_validation(market_data_service, sample_market_data):
+    """Test that the fused validation pass scores the same as validate + re-score"""
+    data_quality = market_data_service.data_quality
+    
+    two_step = await data_quality.validate_market_data(sample_market_data, "test_source")
+    fused = await data_quality.validate_and_score(sample_market_data, "test_source")
+    
+    assert fused.total_records == two_step.total_records
+    assert len(fused.issues) == len(two_step.issues)
+    assert fused.quality_score == two_step.quality_score
+    assert fused.passed_validation == two_step.passed_validation
+
+
 @pytest.mark.asyncio
 async def test_data_quality_validation_with_issues(market_data_service):
     """Test data quality validation with issues"""
@@ -125,6 +141,113 @@ async def test_circuit_breaker_functionality(market_data_service):
     assert not market_data_service._is_circuit_open("test_service")
 
 
+@pytest.mark.asyncio
+async def test_circuit_breaker_half_open_probe(market_data_service):
+    """Test that an expired open circuit admits a single probe before closing"""
+    for _ in range(3):
+        market_data_service._record_circuit_breaker_failure("test_service")
+    
+    # Calls are rejected while the circuit is open
+    with pytest.raises(CircuitOpen):
+        async with market_data_service._breaker("test_service"):
+            pass
+    
+    # Expire the cooldown so the next call becomes the half-open probe
+    breaker = market_data_service._circuit_breaker["test_service"]
+    breaker.opened_at -= breaker.cooldown_seconds
+    
+    async with market_data_service._breaker("test_service"):
+        assert breaker.state == "half_open"
+        assert market_data_service._is_circuit_open("test_service")
+    
+    assert breaker.state == "closed"
+    assert not market_data_service._is_circuit_open("test_service")
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_cancelled_probe_recovers(market_data_service):
+    """Test that a half-open probe cut off by the fetch deadline doesn't wedge the breaker"""
+    for _ in range(3):
+        market_data_service._record_circuit_breaker_failure("exchange_api")
+    breaker = market_data_service._circuit_breaker["exchange_api"]
+    breaker.opened_at -= breaker.cooldown_seconds
+    
+    async def slow_exchange_rates():
+        await asyncio.sleep(1)
+        return {}
+    
+    market_data_service.FETCH_DEADLINE_SECONDS = 0.2
+    with patch.object(market_data_service, "get_exchange_rates", side_effect=slow_exchange_rates):
+        await market_data_service._fetch_all_market_data()
+    
+    # The cancelled probe re-opens the circuit instead of leaving it half-open
+    assert breaker.state == "open"
+    assert not breaker.half_open_probe_in_flight
+    
+    # Once the cooldown expires a healthy upstream closes it again
+    breaker.opened_at -= breaker.cooldown_seconds
+    with patch.object(market_data_service, "get_exchange_rates", AsyncMock(return_value={})):
+        await market_data_service._fetch_all_market_data()
+    
+    assert breaker.state == "closed"
+    assert not market_data_service._is_circuit_open("exchange_api")
+
+
+@pytest.mark.asyncio
+async def test_overlapping_ingestion_cycles_keep_clock_advancing(market_data_service):
+    """Test that overlapping cycles on a shared pipeline don't leave a stale pinned timestamp"""
+    delays = iter([0.05, 0.1])  # The first cycle finishes while the second is still running
+    
+    async def fake_ingestion(force_refresh):
+        pinned = market_data_service._clock()
+        await asyncio.sleep(next(delays))
+        assert market_data_service._clock() == pinned  # Stable within a cycle
+        return pinned
+    
+    with patch.object(market_data_service, "_run_ingestion", side_effect=fake_ingestion):
+        first = asyncio.create_task(market_data_service.ingest_market_data())
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(market_data_service.ingest_market_data())
+        _, second_pinned = await asyncio.gather(first, second)
+    
+    # Outside any cycle the clock follows wall-clock time again
+    await asyncio.sleep(0.01)
+    assert market_data_service._clock() > second_pinned
+
+
+@pytest.mark.asyncio
+async def test_fred_retry_after_serves_fallback_without_waiting(market_data_service):
+    """Test that a long Retry-After is capped and FRED calls fall back instead of sleeping"""
+    market_data_service.fred_api_key = "test-key"
+    market_data_service._fred_limit.record_throttle(retry_after=3600)
+    
+    pause = market_data_service._fred_limit._resume_at - time.monotonic()
+    assert 0 < pause <= market_data_service.FRED_MAX_PAUSE_SECONDS
+    
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=AssertionError("FRED must not be called while paused"))
+    with patch.object(market_data_service, "_http", return_value=client):
+        rates = await asyncio.wait_for(market_data_service.get_federal_reserve_rates(), timeout=1)
+    
+    assert set(rates) == set(market_data_service.FRED_SERIES)
+    client.get.assert_not_called()
+
+
+def test_fred_concurrency_limit_survives_new_event_loop(market_data_service):
+    """Test that the shared FRED limit works from more than one event loop"""
+    limit = market_data_service._fred_limit
+    
+    async def contend():
+        async def hold():
+            async with limit.slot():
+                await asyncio.sleep(0)
+        await asyncio.gather(*(hold() for _ in range(limit.max_limit * 2)))
+    
+    asyncio.run(contend())
+    asyncio.run(contend())
+    assert limit.in_flight == 0
+
+
 @pytest.mark.asyncio
 async def test_federal_reserve_rates_demo_mode(market_data_service):
     """Test Federal Reserve rates in demo mode"""
@@ -142,7 +265,26 @@ async def test_federal_reserve_rates_demo_mode(market_data_service):
             assert hasattr(rate, 'rate')
             assert hasattr(rate, 'date')
             assert hasattr(rate, 'source')
-            assert isinstance(rate.rate, Decimal)
+            assert isinstance(rate.rate, float)
+
+
+@pytest.mark.asyncio
+async def test_fred_conditional_request_not_modified(market_data_service):
+    """Test that a 304 response reuses the previously fetched FRED rate"""
+    market_data_service.fred_api_key = "test-key"
+    
+    ok_response = MagicMock(status_code=200, headers={"Last-Modified": "Mon, 08 Jan 2024 00:00:00 GMT"})
+    ok_response.content = b'{"observations": [{"date": "2024-01-08", "value": "5.33"}]}'
+    not_modified = MagicMock(status_code=304, headers={})
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=[ok_response, not_modified])
+    
+    first = await market_data_service._fetch_fred_series(client, "FEDFUNDS", "fed_funds")
+    second = await market_data_service._fetch_fred_series(client, "FEDFUNDS", "fed_funds")
+    
+    assert first.rate == 5.33
+    assert second is first
+    assert client.get.call_args.kwargs["headers"] == {"If-Modified-Since": "Mon, 08 Jan 2024 00:00:00 GMT"}
 
 
 @pytest.mark.asyncio
@@ -159,7 +301,7 @@ async def test_exchange_rates_demo_mode(market_data_service):
         assert hasattr(rate, 'source')
         assert hasattr(rate, 'base_currency')
         assert hasattr(rate, 'target_currency')
-        assert isinstance(rate.rate, Decimal)
+        assert isinstance(rate.rate, float)
 
 
 @pytest.mark.asyncio
@@ -174,7 +316,7 @@ async def test_treasury_yield_curve(market_data_service):
         assert hasattr(yield_point, 'maturity')
         assert hasattr(yield_point, 'yield_rate')
         assert hasattr(yield_point, 'date')
-        assert isinstance(yield_point.yield_rate, Decimal)
+        assert isinstance(yield_point.yield_rate, float)
 
 
 @pytest.mark.asyncio
@@ -232,6 +374,25 @@ async def test_anomaly_detection(market_data_service):
     assert fed_funds_anomaly.issue_type == DataQualityIssueType.OUTLIER
 
 
+@pytest.mark.asyncio
+async def test_anomaly_detection_zero_fx_rate(market_data_service):
+    """Test that a zero FX quote is reported as an anomaly instead of raising"""
+    historical_data = [
+        {"exchange_rates": {"EUR": {"rate": 1.08 + i * 0.001}}}
+        for i in range(6)
+    ]
+    current_data = {"exchange_rates": {"EUR": {"rate": 0.0}}}
+    
+    anomalies = await market_data_service.data_quality.detect_anomalies(
+        current_data,
+        historical_data
+    )
+    
+    eur_anomaly = next((a for a in anomalies if a.field_name == "EUR.rate"), None)
+    assert eur_anomaly is not None
+    assert eur_anomaly.severity == DataQualitySeverity.CRITICAL
+
+
 @pytest.mark.asyncio 
 async def test_backup_data_sources(market_data_service):
     """Test backup data source functionality"""
@@ -268,8 +429,8 @@ def test_yield_curve_slope_calculation(market_data_service):
     from app.services.market_data import TreasuryYield
     
     yield_curve = [
-        TreasuryYield(maturity="2Y", yield_rate=Decimal("4.0"), date=datetime.now()),
-        TreasuryYield(maturity="10Y", yield_rate=Decimal("4.5"), date=datetime.now())
+        TreasuryYield(maturity="2Y", yield_rate=4.0, date=datetime.now()),
+        TreasuryYield(maturity="10Y", yield_rate=4.5, date=datetime.now())
     ]
     
     slope = market_data_service._calculate_yield_curve_slope(yield_curve)
@@ -10,6 +10,7 @@ Properties tested:
 - Property 2: Market-Driven Recalculation  
 - Property 3: Liquidity Shortfall Response
 - Property 4: Comprehensive Optimization Recommendations
+- Allocation LP constraints (position cap, immediate-tier floor, fallback)
 """
 
 import pytest
@@ -18,7 +19,9 @@ from hypothesis import given, strategies as st, settings, assume, HealthCheck
 from decimal import Decimal
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
+from unittest.mock import patch
 import numpy as np
+from scipy.optimize import OptimizeResult
 
 from app.services.analytics import TreasuryAnalyticsEngine, OptimizationResult
 from app.services.market_data import MarketDataIngestionPipeline
@@ -405,6 +408,91 @@ class TestCashOptimizationProperties:
         asyncio.run(run_test())
 
 
+
+class TestAllocationConstraints:
+    """Tests for the allocation LP built from the optimization constraints"""
+    
+    @pytest.fixture
+    def analytics_engine(self):
+        """Create analytics engine for testing"""
+        return TreasuryAnalyticsEngine(MarketDataIngestionPipeline())
+    
+    @staticmethod
+    def _positions(tiers: List[LiquidityTier]) -> List[CashPosition]:
+        return [CashPosition(liquidity_tier=tier) for tier in tiers]
+    
+    @given(
+        tiers=st.lists(st.sampled_from(list(LiquidityTier)), min_size=2, max_size=10),
+        yields=st.lists(st.floats(min_value=0.0, max_value=10.0, allow_nan=False, allow_infinity=False), min_size=10, max_size=10),
+        max_single_position=st.floats(min_value=0.05, max_value=1.0),
+        min_immediate=st.floats(min_value=0.0, max_value=0.5)
+    )
+    @settings(max_examples=100, deadline=30000, suppress_health_check=[HealthCheck.function_scoped_fixture])
+    def test_property_allocation_respects_constraints(self, tiers, yields, max_single_position, min_immediate, analytics_engine):
+        """The LP solution is fully invested, under the position cap and above the immediate floor"""
+        positions = self._positions(tiers)
+        yield_vector = np.array(yields[:len(tiers)])
+        lp_constraints = analytics_engine._build_constraint_matrix(positions, {
+            "max_single_position": max_single_position,
+            "min_liquidity_tier_immediate": min_immediate
+        })
+        
+        weights = analytics_engine._solve_optimization(yield_vector, np.eye(len(tiers)) * 0.01, lp_constraints)
+        
+        n = len(tiers)
+        immediate = np.array([tier == LiquidityTier.IMMEDIATE for tier in tiers])
+        cap = max(max_single_position, 1.0 / n)
+        floor = min(min_immediate, cap * immediate.sum())
+        
+        assert abs(weights.sum() - 1.0) < 1e-6
+        assert np.all(weights >= -1e-9)
+        assert np.all(weights <= cap + 1e-9)
+        assert weights[immediate].sum() >= floor - 1e-6
+        
+        # Feasible constraints are passed through unchanged
+        if max_single_position >= 1.0 / n and min_immediate <= max_single_position * immediate.sum():
+            assert lp_constraints["bounds"] == (0.0, max_single_position)
+            assert lp_constraints["b_ub"][0] == -min_immediate
+    
+    def test_infeasible_constraints_are_widened(self, analytics_engine):
+        """A cap below 1/n is raised to 1/n and the floor is lowered to what the immediate positions can hold"""
+        positions = self._positions([
+            LiquidityTier.IMMEDIATE, LiquidityTier.SHORT_TERM,
+            LiquidityTier.MEDIUM_TERM, LiquidityTier.LONG_TERM
+        ])
+        lp_constraints = analytics_engine._build_constraint_matrix(positions, {
+            "max_single_position": 0.1,
+            "min_liquidity_tier_immediate": 0.9
+        })
+        
+        assert lp_constraints["bounds"] == (0.0, 0.25)
+        assert lp_constraints["b_ub"][0] == pytest.approx(-0.25)
+        
+        weights = analytics_engine._solve_optimization(np.array([1.0, 4.0, 3.0, 2.0]), np.eye(4) * 0.01, lp_constraints)
+        
+        np.testing.assert_allclose(weights, 0.25, atol=1e-9)
+    
+    def test_unsolved_lp_falls_back_to_yield_weighted_allocation(self, analytics_engine):
+        """When linprog does not succeed, weights tilt toward higher yields and still sum to 1"""
+        positions = self._positions([LiquidityTier.IMMEDIATE] * 3)
+        lp_constraints = analytics_engine._build_constraint_matrix(positions, {"max_single_position": 0.5})
+        yields = np.array([1.0, 3.0, 2.0])
+        
+        unsolved = OptimizeResult(success=False, status=2, message="The problem is infeasible.")
+        with patch("app.services.analytics.linprog", return_value=unsolved) as mock_linprog:
+            weights = analytics_engine._solve_optimization(yields, np.eye(3) * 0.01, lp_constraints)
+        
+        mock_linprog.assert_called_once()
+        assert weights.sum() == pytest.approx(1.0)
+        assert weights[1] > weights[2] > weights[0]
+        
+        # Equal yields leave the equal-weight baseline
+        with patch("app.services.analytics.linprog", return_value=unsolved):
+            weights = analytics_engine._solve_optimization(np.full(3, 2.0), np.eye(3) * 0.01, lp_constraints)
+        
+        np.testing.assert_allclose(weights, 1.0 / 3)
+
+
 if __name__ == "__main__":
     # Run property tests with verbose output
     pytest.main([__file__, "-v", "--tb=short"])
\ No newline at end of file